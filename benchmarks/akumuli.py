@@ -0,0 +1,41 @@
+#!/usr/bin/env python
+# coding: utf-8
+"""
+Benchmark of the Akumuli batch kernels against the predict/update protocol,
+best of a few runs each.
+
+Usage: PYTHONPATH=. python benchmarks/akumuli.py
+"""
+
+from timeit import repeat
+from cframe.modifier.predictor.akumuli import Akumuli
+from cframe.modifier.subtractor.xor import XOR
+from cframe.modifier.subtractor.floatingpoint import FPD
+from cframe.modifier.sequencer.linear import Linear
+from cframe.objects.arrays.integerarray import IntegerArray
+from cframe.toolbox.feeder import SeqFeeder
+from cframe.toolbox.workflow import reverse
+import numpy as np
+
+
+if __name__ == '__main__':
+    for dtype, bits in ((np.uint32, 32), (np.int64, 64)):
+        data = np.random.randint(0, 2**20, 200000).astype(dtype).cumsum(dtype=dtype)
+        seq = Linear.flatten(0, IntegerArray(data.reshape(400, 500)))
+        _, parr = SeqFeeder(Akumuli).feed(seq)
+        new = min(repeat(lambda: SeqFeeder(Akumuli).feed(seq), number=1, repeat=5))
+        batch, Akumuli.predict_all = Akumuli.predict_all, None
+        old = min(repeat(lambda: SeqFeeder(Akumuli).feed(seq), number=1, repeat=3))
+        Akumuli.predict_all = batch
+        print('{} ({} values): compress {:.3f}s -> {:.4f}s ({:.0f}x), equal: {}'.format(
+            np.dtype(dtype), data.size, old, new, old / new,
+            np.array_equal(Akumuli(bits=bits).predict_all(data), parr.array.ravel())))
+        for subtractor in (XOR, FPD):
+            residuals = subtractor.ufunc(parr.array.ravel(), data)
+            new = min(repeat(lambda: Akumuli(bits=bits).reconstruct_all(residuals, subtractor),
+                             number=1, repeat=5))
+            old = min(repeat(lambda: list(reverse(residuals, Akumuli, subtractor, bits=bits)),
+                             number=1, repeat=3))
+            same = np.array_equal(Akumuli(bits=bits).reconstruct_all(residuals, subtractor), data)
+            print('    decompress {} {:.3f}s -> {:.4f}s ({:.0f}x), equal: {}'.format(
+                subtractor.__name__, old, new, old / new, same))
@@ -0,0 +1,38 @@
+#!/usr/bin/env python
+# coding: utf-8
+"""
+Benchmark of the Lindstrom mapper against a per element bitstring mapping.
+
+Usage: PYTHONPATH=. python benchmarks/lindstrom.py
+"""
+
+from timeit import timeit
+from bitstring import BitArray as ba
+from cframe.modifier.mapper.lindstrom import Lindstrom
+from cframe.objects.arrays.floatarray import FloatArray
+import numpy as np
+
+
+def _lindstrom(value, length):
+    result = ba(floatbe=value, length=length)
+    if value < 0:
+        result.invert()
+    else:
+        result.invert(0)
+    return result.uintbe
+
+
+_vlindstrom = np.frompyfunc(_lindstrom, 2, 1)
+
+
+if __name__ == '__main__':
+    for dtype, length in ((np.float32, 32), (np.float64, 64)):
+        farr = FloatArray(np.random.randn(32, 64, 64).astype(dtype))
+        out = np.empty(farr.array.shape, 'uint{}'.format(length))
+        old = timeit(lambda: _vlindstrom(farr.array, length), number=1)
+        new = timeit(lambda: Lindstrom.map(farr, out=out), number=10) / 10
+        same = np.array_equal(_vlindstrom(farr.array, length).astype(out.dtype),
+                              Lindstrom.map(farr).array)
+        print('{} ({} values): bitstring {:.4f}s, vectorized {:.6f}s, '
+              'speedup {:.0f}x, equal: {}'.format(np.dtype(dtype), farr.array.size,
+                                                  old, new, old / new, same))
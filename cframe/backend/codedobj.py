@@ -47,4 +47,4 @@ class BaseCoded(CodedInterface):
 
     @property
     def nbytes(self):
-        return len(self.blzc + self.bnoise)
+        return len(self.blzc) + len(self.bnoise)
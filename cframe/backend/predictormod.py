@@ -40,11 +40,24 @@ class BasePredictor(PredictorInterface):
 
 
 class CorePredictor(BasePredictor):
-    pass
+    """Predictor on the sequence of values alone.
+
+    Subclasses may implement `predict_all(data)` returning the predictions
+    for a whole sequence at once and `reconstruct_all(residuals,
+    subtractor)` returning the values of a whole residual sequence (or
+    NotImplemented for unsupported subtractors). Both continue from (and
+    update) the current state. Callers use them when they are not None and
+    fall back to `predict`/`update` otherwise.
+    """
+
+    predict_all = None
+    reconstruct_all = None
 
 
 class MixedPredictor(BasePredictor):
-    pass
+    """Predictor combining other predictors (see `CorePredictor` hooks)."""
+
+    predict_all = None
 
 
 class NDPredictor(BasePredictor):
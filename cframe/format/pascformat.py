@@ -2,6 +2,8 @@
 # coding=utf-8
 """Create a pasc formatted compressed binary file."""
 
+import mmap
+from io import BytesIO
 from sys import byteorder
 from functools import namedtuple as nt
 import numpy as np
@@ -13,10 +15,31 @@ INFOFLAG = nt('iflag', 'startvalue, is_32, little_endian')
 PADFLAG = nt('pflag', 'lzcpad, noisepad')
 STREAM = nt('stream', 'is_32, startvalue, npad, lpad, blzc, bnoise, next_stream')
 
+VERSION = 2  # Format version written by default
+FOOTER = np.dtype([('index', '<u8'), ('magic', 'S4')])
+
+
+def _entrytype(ndim):
+    """Record of a stream in the PSC2 index table."""
+    return np.dtype([('offset', '<u8'), ('length', '<u8'), ('bits', 'u1'),
+                     ('shape', '<u4', (ndim,))])
+
+
+def _codedlist(coded, same_shape=True):
+    """List of coded objects (with the same shape)."""
+    if isinstance(coded, Coded):
+        return [coded]
+    if isinstance(coded, list) and coded and all(
+            [isinstance(x, Coded) and (x.shape == coded[0].shape or not same_shape)
+             for x in coded]):
+        return coded
+    msg = "Error with input data"
+    raise TypeError(msg)
+
 
 class Format:
 
-    def to_bytes(coded):
+    def to_bytes(coded, version=VERSION, shape=None):
         """
         Encode coded objects to bytes for disk output.
 
@@ -28,35 +51,77 @@ class Format:
             Coded objects to be encoded.
         version : int
             Version of format to be encoded to.
+        shape : tuple
+            Shape in the header, defaults to the shape of the first object.
 
         Returns
         =======
         result : bytes
             Pasc formatted bytes object.
         """
-        if isinstance(coded, Coded):
-            shape = coded.shape
-            nvars = 1
-            coded = [coded]
-        elif isinstance(coded, list) and all([isinstance(x, Coded) and x.shape == coded[0].shape for x in coded]):
-            shape = coded[0].shape
-            nvars = len(coded)
-        else:
-            msg = "Error with input data"
-            raise TypeError(msg)
-        header = Format.generate_header(coded[0], nvars)
-        stream = b''
-        for code in coded:
-            stream += Format.generate_stream(code)
-        return header + stream
+        out = BytesIO()
+        Format.write(coded, out, version, shape)
+        return out.getvalue()
+
+    def write(coded, fileobj, version=VERSION, shape=None):
+        """
+        Write coded objects in pasc dataformat to a binary file object.
+
+        Header and streams are written piece by piece, the data blocks are
+        never copied into one bytes object. Version 2 appends the index
+        table and the footer, its streams may differ in shape (but not in
+        the number of dimensions).
+
+        Arguments
+        =========
+        coded : (list of) coded object
+            Coded objects to be encoded.
+        fileobj : file object
+            Binary file object opened for writing.
+        version : int
+            Version of format to be encoded to.
+        shape : tuple
+            Shape in the header, defaults to the shape of the first object.
+
+        Returns
+        =======
+        result : int
+            Number of bytes written.
+        """
+        coded = _codedlist(coded, same_shape=version < 2)
+        shape = coded[0].shape if shape is None else shape
+        written = fileobj.write(Format.generate_header(coded[0], len(coded), version, shape))
+        if version < 2:
+            for code in coded:
+                for part in Format.stream_parts(code):
+                    written += fileobj.write(part)
+            return written
+
+        index = np.zeros(len(coded), _entrytype(len(shape)))
+        for entry, code in zip(index, coded):
+            if len(code.shape) != len(shape):
+                msg = "Expected {} dimensions, got {}".format(len(shape), code.shape)
+                raise ValueError(msg)
+            start = written
+            for part in Format.stream_parts(code):
+                written += fileobj.write(part)
+            entry['offset'], entry['length'] = start, written - start
+            entry['bits'], entry['shape'] = code.bits, code.shape
+        footer = np.array([(written, b'PSC2')], FOOTER)
+        written += fileobj.write(index.tobytes())
+        written += fileobj.write(footer.tobytes())
+        return written
 
     def from_bytes(byte):
         """
         Decode bytes to coded objects.
 
+        The blzc and bnoise blocks of the result are memoryview slices of
+        `byte`, nothing is copied.
+
         Arguments
         =========
-        byte : bytes
+        byte : bytes, memoryview, mmap
             Pasc formatted bytes object.
 
         Result
@@ -64,48 +129,128 @@ class Format:
         result : Coded
             Decoded Coded object from bytes.
         """
-        header = Format.read_header(byte)
-        nvars = header.nvars
-
-        data = []
-        byte = byte[header[-1] + 1:]
-        while nvars > 0:
-            pack = Format.read_stream(byte)
-            data.append(pack)
-            byte = byte[pack.next_stream:]
-            nvars -= 1
-
-        result = []
-        for pack in data:
-            bits = 32 if pack.is_32 else 64
-            unpacked = Coded(pack.lpad, pack.npad, pack.blzc, pack.bnoise,
-                             pack.startvalue, bits, header.shape, version=header.version)
-            result.append(unpacked)
+        byte = memoryview(byte)
+        header, index = Format.read_index(byte)
+        result = [Format.read_coded(byte, header, entry) for entry in index]
         return result if len(result) > 1 else result[0]
 
-    def generate_header(coded, nvars):
+    def read_index(byte):
+        """
+        Read the header and the position of every stream.
+
+        PSC2 files carry an index table, which is read via the footer at
+        the end of the file. For older versions the stream metadata is
+        parsed once from front to back.
+
+        Arguments
+        =========
+        byte : bytes, memoryview, mmap
+            Pasc formatted bytes object.
+
+        Returns
+        =======
+        result : (Header, np.ndarray)
+            Header and index table (records with offset, length, bits and
+            shape of each stream).
+        """
+        byte = memoryview(byte)
+        header = Format.read_header(byte)
+        if header.version >= 2:
+            footer = np.frombuffer(byte[len(byte) - FOOTER.itemsize:], FOOTER)[0]
+            if footer['magic'] != b'PSC2':
+                msg = "Expected PSC2 footer, got {}".format(footer['magic'])
+                raise ValueError(msg)
+            table = byte[int(footer['index']):len(byte) - FOOTER.itemsize]
+            return header, np.frombuffer(table, _entrytype(header.ndim)).copy()
+
+        index = np.zeros(header.nvars, _entrytype(header.ndim))
+        offset = header.offset
+        for entry in index:
+            pack = Format.read_stream(byte[offset:])
+            entry['offset'], entry['length'] = offset, pack.next_stream
+            entry['bits'], entry['shape'] = 32 if pack.is_32 else 64, header.shape
+            offset += pack.next_stream
+        return header, index
+
+    def read_coded(byte, header, entry):
+        """
+        Decode the stream of an index `entry` to a coded object.
+
+        Arguments
+        =========
+        byte : bytes, memoryview, mmap
+            Pasc formatted bytes object.
+        header : Header
+            Header of the file (see `read_index`).
+        entry : np.void
+            Index record of the stream (see `read_index`).
+
+        Returns
+        =======
+        result : Coded
+            Coded object with zero-copy blzc and bnoise blocks.
+        """
+        offset = int(entry['offset'])
+        pack = Format.read_stream(memoryview(byte)[offset:offset + int(entry['length'])])
+        shape = tuple(int(x) for x in entry['shape'])
+        return Coded(pack.lpad, pack.npad, pack.blzc, pack.bnoise,
+                     pack.startvalue, int(entry['bits']), shape, version=header.version)
+
+    def read(file):
+        """
+        Decode a pasc formatted file via a read-only memory map.
+
+        Only the header and stream metadata are parsed, the data blocks of
+        the result are views into the mapped file. Hence, files of any size
+        open in constant memory.
+
+        Arguments
+        =========
+        file : str, path or file object
+            Path of the file or binary file object with a file descriptor.
+
+        Result
+        ======
+        result : Coded
+            Decoded Coded object(s) from the file.
+        """
+        if hasattr(file, 'fileno'):
+            return Format.from_bytes(mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ))
+        with open(file, 'rb') as fileobj:
+            return Format.read(fileobj)
+
+    def generate_header(coded, nvars, version=None, shape=None):
         """
         Write metadata about the file into the header (according to pasc data format).
 
         Arguments
         =========
-        shape : tuple
-            Shape of the array to be compressed.
+        coded : Coded
+            First coded object of the file.
         nvars : int
             Number of variables to be compressed.
         version : int
-            Version of pasc format to be compressed to.
+            Version of pasc format to be compressed to, defaults to the
+            version of `coded`.
+        shape : tuple
+            Shape of the array to be compressed, defaults to the shape of
+            `coded`.
 
         Returns
         =======
         result : bytes
             Bytes coded header information (according to pasc data format).
         """
+        version = coded.version if version is None else version
+        shape = coded.shape if shape is None else shape
+        if version < 2 and nvars > 255:
+            msg = "Expected at most 255 variables for PSC{}, got {}".format(version, nvars)
+            raise ValueError(msg)
 
-        magic = "PSC{}".format(coded.version).encode('UTF-8')  # , **kwargs)
-        ndims = np.array(len(coded.shape), np.uint8).tobytes()
-        lengths = np.array(coded.shape, np.uint32).tobytes()
-        nvars = np.array(nvars, np.uint8).tobytes()
+        magic = "PSC{}".format(version).encode('UTF-8')  # , **kwargs)
+        ndims = np.array(len(shape), np.uint8).tobytes()
+        lengths = np.array(shape, np.uint32).tobytes()
+        nvars = np.array(nvars, np.uint8 if version < 2 else np.uint32).tobytes()
 
         return magic + ndims + lengths + nvars
 
@@ -123,12 +268,17 @@ class Format:
         result : Header
             Header object of file defined by the constant HEADER.
         """
-        magic = byte[:4].decode('UTF-8')
+        magic = bytes(byte[:4]).decode('UTF-8')
         version = int(magic[-1])
         ndims = int(byte[4])
-        shape = tuple(np.frombuffer(byte[5:5 + ndims * 4], dtype=np.uint32))
-        nvars = int(byte[5 + ndims * 4])
+        shape = tuple(int(x) for x in np.frombuffer(byte[5:5 + ndims * 4], dtype=np.uint32))
         offset = 5 + ndims * 4
+        if version < 2:
+            nvars = int(byte[offset])
+            offset += 1
+        else:
+            nvars = int(np.frombuffer(byte[offset:offset + 4], np.uint32)[0])
+            offset += 4
 
         result = HEADER(magic='PSC', shape=shape, ndim=ndims,
                         nvars=nvars, version=version, offset=offset)
@@ -220,7 +370,7 @@ class Format:
         # pad = num & 7
         # padded = pad != 0
         npad = num & 7
-        lpad = num & (7 << 5)
+        lpad = (num >> 5) & 7
 
         return PADFLAG(lzcpad=lpad, noisepad=npad)
 
@@ -238,6 +388,22 @@ class Format:
         result : bytes
             Encoded information about coded object.
         """
+        return b''.join(Format.stream_parts(coded))
+
+    def stream_parts(coded):
+        """
+        Metadata, blzc and bnoise of a stream (according to pasc data format).
+
+        Arguments
+        =========
+        coded : Coded
+            Data to be encoded.
+
+        Returns
+        =======
+        result : tuple of bytes-like
+            Flags and lengths as bytes, followed by the data blocks as is.
+        """
 
         iflag = Format.generate_infoflag(coded)
         pflag = Format.generate_padflag(coded)
@@ -247,7 +413,7 @@ class Format:
         else:
             result = np.array([len(coded.blzc), len(coded.bnoise)]).astype(
                 np.uint32).tobytes()
-        return iflag + pflag + result + coded.blzc + coded.bnoise
+        return iflag + pflag + result, coded.blzc, coded.bnoise
 
     def read_stream(byte):
         """
@@ -273,8 +439,8 @@ class Format:
         else:
             vstart = 0
             lzcstart = 2
-        lzclen = np.frombuffer(byte[lzcstart:], np.uint32, 1)[0]
-        noiselen = np.frombuffer(byte[lzcstart + 4:], np.uint32, 1)[0]
+        lzclen = int(np.frombuffer(byte[lzcstart:], np.uint32, 1)[0])
+        noiselen = int(np.frombuffer(byte[lzcstart + 4:], np.uint32, 1)[0])
         lzcstart += 8
 
         noisestart = lzcstart + lzclen
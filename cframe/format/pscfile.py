@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+# coding=utf-8
+"""Lazily decoded pasc files."""
+
+import mmap
+from collections import OrderedDict
+from threading import Lock
+from cframe.format.pascformat import Format
+
+
+class PSCFile:
+    """Memory mapped pasc file, variables are decoded on access.
+
+    Opening parses the header and the stream index only. `coded(k)` hands
+    out the k-th stream with zero-copy data blocks, `file[k]` decodes it to
+    a FloatArray with `workflow`. Decoded variables are kept in a LRU cache
+    bounded by the summed size of the arrays.
+
+    Arguments
+    =========
+    file : str, path or file object
+        Path of the file or binary file object with a file descriptor.
+    workflow : Workflow
+        Workflow the file was compressed with, needed for decoding.
+    maxbytes : int
+        Upper bound for the size of all cached FloatArrays, 0 disables
+        the cache.
+    """
+
+    def __init__(self, file, workflow=None, maxbytes=0):
+        if hasattr(file, 'fileno'):
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            with open(file, 'rb') as fileobj:
+                self._mmap = mmap.mmap(fileobj.fileno(), 0, access=mmap.ACCESS_READ)
+        self.header, self.index = Format.read_index(self._mmap)
+        self.workflow = workflow
+        self.maxbytes = maxbytes
+        self.nbytes = 0
+        self._cache = OrderedDict()
+        self._lock = Lock()
+
+    def __len__(self):
+        return len(self.index)
+
+    def __repr__(self):
+        return "PSCFile(PSC{}, {} variables, shape {})".format(
+            self.header.version, len(self), self.shape)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    @property
+    def shape(self):
+        return self.header.shape
+
+    def coded(self, k):
+        """Coded object of the k-th variable."""
+        return Format.read_coded(self._mmap, self.header, self.index[k])
+
+    def __getitem__(self, k):
+        k = range(len(self))[k]
+        with self._lock:
+            farr = self._cache.get(k)
+            if farr is not None:
+                self._cache.move_to_end(k)
+                return farr
+        if self.workflow is None:
+            msg = "Expected workflow for decoding, got None"
+            raise TypeError(msg)
+        farr = self.workflow.decompress(self.coded(k))
+        self._put(k, farr)
+        return farr
+
+    def decompress_region(self, slices, cpus=None):
+        """FloatArray of the hyperslab `slices` of a tiled file.
+
+        Only the intersecting blocks are decoded, see
+        `TiledWorkflow.decompress_region`.
+        """
+        from cframe.toolbox.tiling import TiledWorkflow  # Imports this module
+        tiled = TiledWorkflow(self.workflow, self.index[0]['shape'], cpus)
+        return tiled.decompress_region(self, slices)
+
+    def close(self):
+        """Unmap the file, Coded objects of `coded` have to be released first."""
+        with self._lock:
+            self._cache.clear()
+            self.nbytes = 0
+        self._mmap.close()
+
+    def _put(self, k, farr):
+        if farr.array.nbytes > self.maxbytes:
+            return
+        farr.array.setflags(write=False)
+        with self._lock:
+            if k not in self._cache:
+                self._cache[k] = farr
+                self.nbytes += farr.array.nbytes
+            while self.nbytes > self.maxbytes:
+                _, old = self._cache.popitem(last=False)
+                self.nbytes -= old.array.nbytes
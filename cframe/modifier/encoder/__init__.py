@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+# coding: utf-8
+"""
+Encoder modifier with shared helpers for packing variable length bit fields.
+"""
+
+from cframe.toolbox.bitops import lzc
+import numpy as np
+
+_CHUNK = 2**16  # Values per bit matrix while (un)packing
+
+
+def _lzc_width(bits):
+    """Width of a leading zero count field for `bits` wide values."""
+    return 5 if bits == 32 else 6
+
+
+def _leading_zeros(values, bits, width=None):
+    """Leading zero counts of `values`, clamped to the LZC field `width`.
+
+    Zeros wider than the field get the largest count, which leaves one
+    noise bit ('0').
+    """
+    limit = 2**(width or _lzc_width(bits)) - 1
+    return np.minimum(lzc(values), limit)
+
+
+def _pack(values, lengths, bits):
+    """Concatenate the lowest `lengths` bits of `values`, most significant first.
+
+    The bit stream is padded with zeros at the front to full bytes.
+    Returns the number of pad bits and the bytes.
+    """
+    values = np.ascontiguousarray(values, '>u{}'.format(bits // 8)).ravel()
+    lengths = np.asarray(lengths).ravel()
+    total = int(lengths.sum(dtype=np.int64))
+    pad = -total % 8
+    columns = np.arange(bits)
+    chunks, carry = [], np.zeros(pad, np.uint8)
+    for lo in range(0, values.size, _CHUNK):
+        matrix = np.unpackbits(values[lo:lo + _CHUNK].view(np.uint8).reshape(-1, bits // 8), axis=1)
+        mask = columns >= bits - lengths[lo:lo + _CHUNK, None]
+        stream = np.concatenate([carry, matrix[mask]])
+        full = stream.size - stream.size % 8
+        chunks.append(np.packbits(stream[:full]))
+        carry = stream[full:]
+    return pad, b''.join(x.tobytes() for x in chunks)
+
+
+def _unpack(data, pad, lengths, bits):
+    """Inverse of `_pack`: split the bit stream into fields of `lengths` bits.
+
+    The start of each field is the prefix sum of the preceding lengths.
+    Each field is cut out of the (unaligned) 64 bit big endian words at
+    its first byte, fields reaching past such a word also read the next one.
+    Returns an unsigned array of `bits` wide values.
+    """
+    buf = np.frombuffer(data, np.uint8)
+    padded = np.zeros(buf.size + 16, np.uint8)
+    padded[:buf.size] = buf
+    words = np.ndarray((buf.size + 9,), '>u8', padded, strides=(1,))
+    lengths = np.asarray(lengths).ravel()
+    starts = pad + np.cumsum(lengths, dtype=np.int64) - lengths
+    result = np.empty(lengths.size, 'uint{}'.format(bits))
+    one = np.uint64(1)
+    for lo in range(0, lengths.size, _CHUNK):
+        first, offset = np.divmod(starts[lo:lo + _CHUNK], 8)
+        offset = offset.astype(np.uint64)
+        length = lengths[lo:lo + _CHUNK].astype(np.uint64)
+        top = words[first] << offset
+        if bits > 32:
+            top |= (words[first + 8] >> one) >> (np.uint64(63) - offset)
+        fields = (top >> one) >> (np.uint64(63) - np.minimum(length, 63))
+        result[lo:lo + _CHUNK] = np.where(length > 63, top, fields)
+    return result
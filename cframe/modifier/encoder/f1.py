@@ -7,7 +7,8 @@ Encoder for format 1.
 from cframe.backend.encodermod import BaseEncoder
 from cframe.objects.arrays.residualarray import ResidualArray
 from cframe.objects.coded import Coded
-from cframe.modifier.encoder import raw
+from cframe.modifier.encoder import _leading_zeros, _pack, _unpack
+from cframe.toolbox import get_bits
 import numpy as np
 
 
@@ -18,87 +19,70 @@ class F1(BaseEncoder):
     @staticmethod
     def encode(rarr, start, shape):
         npad, lpad, nvalues, lvalues, bits = Look.compress(rarr.array)
-        nbytes = bytes(nvalues)
-        lbytes = bytes(lvalues)
+        nbytes = nvalues.tobytes()
+        lbytes = lvalues.tobytes()
         return Coded(lpad, npad, lbytes, nbytes, start, bits, shape, version=1)
 
     @staticmethod
     def decode(coded):
         recon_rarr = Look.decompress(lpad=coded.lpad,
                                      npad=coded.npad,
-                                     lvalues=list(coded.blzc),
-                                     nvalues=list(coded.bnoise),
+                                     lvalues=coded.blzc,
+                                     nvalues=coded.bnoise,
                                      bits=coded.bits)
-        dtype_adjusted = np.array(recon_rarr, dtype='uint{}'.format(coded.bits))
-        dtype_adjusted = dtype_adjusted.astype('int{}'.format(coded.bits))
-        # shape_adjusted = dtype_adjusted.reshape(coded.shape)
-        # return ResidualArray(shape_adjusted)
-        return ResidualArray(dtype_adjusted)
+        dtype_adjusted = recon_rarr.view('int{}'.format(coded.bits))
+        return ResidualArray(dtype_adjusted.reshape(coded.shape))
 
 
 class Look:
     """Encoding of <uint> data.
 
-    The data is being split into Leading Zero Lengths and noise data. The LZC are transformed into
-
-    Note
-    ====
-    This method will not work because of transformation errors on int32 values.
+    The data is being split into Leading Zero Counts and noise data. The
+    LZC are stored as 6 bit fields, the noise is each value without its
+    leading zeros. Both bit streams are padded with zeros at the front.
     """
 
     version=1
 
-    def compact(data):
+    def compact(data, lzc=None):
         """Compact representation of data. Needs LZC for decompression."""
-        bits = int(str(data.dtype)[-2:])
-        strings = "".join(raw.vget_noise(data, bits).reshape(data.size).tolist())
-
-        pad = 8 - (len(strings) % 8)
-        pad = 0 if pad == 8 else pad
-        result = "0"*pad
-        result += strings
-        result = [int(result[i:i+8], 2) for i in range(0, len(result), 8)]
-        return pad, result
+        bits = get_bits(data)
+        data = np.ascontiguousarray(data).view('uint{}'.format(bits))
+        lzc = _leading_zeros(data, bits, 6) if lzc is None else lzc
+        pad, result = _pack(data, bits - lzc, bits)
+        return pad, np.frombuffer(result, np.uint8)
 
-    def zeros(data):
+    def zeros(data, lzc=None):
         """Compact 6 Bit representation of LZC."""
-        bits = int(str(data.dtype)[-2:])
-        result = raw.vleading_zeros(data, bits).astype('uint8')
-        result = raw.vbinary_repr(result, 6)
-        strings = "".join(result.reshape(data.size).tolist())
-
-        pad = 8 - (len(strings) % 8)
-        pad = 0 if pad == 8 else pad
-        result = "0"*pad
-        result += strings
-        result = [int(result[i:i+8], 2) for i in range(0, len(result), 8)]
-        return pad, result
+        bits = get_bits(data)
+        if lzc is None:
+            lzc = _leading_zeros(np.ascontiguousarray(data).view('uint{}'.format(bits)), bits, 6)
+        pad, result = _pack(lzc, np.full(lzc.size, 6), 8)
+        return pad, np.frombuffer(result, np.uint8)
 
     def compress(data):
-        bits = int(str(data.dtype)[-2:])
-        npad, nvalues = Look.compact(data)
-        lpad, lvalues = Look.zeros(data)
+        bits = get_bits(data)
+        lzc = _leading_zeros(np.ascontiguousarray(data).view('uint{}'.format(bits)), bits, 6)
+        lpad, lvalues = Look.zeros(data, lzc)
+        npad, nvalues = Look.compact(data, lzc)
         return npad, lpad, nvalues, lvalues, bits
 
     def decompress(lpad, npad, lvalues, nvalues, bits):
-        lstrings = raw.vbinary_repr(lvalues, 8)
-        lstrings = "".join(lstrings)[lpad:]
-        lvalues = [int(x, 2) for x in Look.split(lstrings, 6)]
-
-        nstrings = raw.vbinary_repr(nvalues, 8)
-        nstrings = "".join(nstrings)[npad:]
-        nvalues  = [int('0'*y+x, 2) if y and y!=bits else 0 for y,x in zip(lvalues, Look.noisypart(nstrings, lvalues, bits))]
-        return nvalues
-
-    def noisypart(test_noise_str, zeros, bits):
-        i=0
-        for lzc in zeros:
-            yield test_noise_str[i:i+bits-lzc]
-            i += bits-lzc
-
-    def split(inp, size):
-        return [inp[start:start+size] for start in range(0, len(inp), size)]
-
+        lvalues = _buffer(lvalues)
+        lzc = Look.split(lvalues, lpad, (8 * lvalues.size - lpad) // 6)
+        return _unpack(_buffer(nvalues), npad, bits - lzc, bits)
+
+    def split(lvalues, lpad, size):
+        """The `size` 6 bit fields at the end of `lvalues`.
+
+        The bytes are left padded to groups of three, which hold four
+        fields each, and every byte is looked up in `_FIELDS`.
+        """
+        groups = np.zeros(-(-lvalues.size // 3) * 3, np.uint8)
+        groups[groups.size - lvalues.size:] = lvalues
+        groups = groups.reshape(-1, 3)
+        fields = _FIELDS[0, groups[:, 0]] | _FIELDS[1, groups[:, 1]] | _FIELDS[2, groups[:, 2]]
+        return fields.ravel()[fields.size - size:]
 
     def test(runs=30):
         run = 0
@@ -115,6 +99,30 @@ class Look:
         return errstates
 
 
+def _buffer(values):
+    """uint8 array of a list or (zero-copy) of a bytes-like object."""
+    try:
+        return np.frombuffer(values, np.uint8)
+    except TypeError:
+        return np.asarray(values, np.uint8)
+
+
+def _fields():
+    """Contribution of each byte of a 3 byte group to its four 6 bit fields."""
+    byte = np.arange(256, dtype=np.uint8)
+    table = np.zeros((3, 256, 4), np.uint8)
+    table[0, :, 0] = byte >> 2
+    table[0, :, 1] = (byte & 3) << 4
+    table[1, :, 1] = byte >> 4
+    table[1, :, 2] = (byte & 15) << 2
+    table[2, :, 2] = byte >> 6
+    table[2, :, 3] = byte & 63
+    return table
+
+
+_FIELDS = _fields()
+
+
 if __name__ == '__main__':
     result = Look.test()
     print(result)
@@ -6,61 +6,73 @@
 from cframe.backend.mappermod import BaseMapper
 from cframe.objects.arrays.floatarray import FloatArray  # Input
 from cframe.objects.arrays.integerarray import IntegerArray  # Output
+from cframe.toolbox import _output
 import numpy as np
-from bitstring import BitArray as ba
 
 
 class Lindstrom(BaseMapper):
-    """Map float to uint with saving order (based on Lindstrom et al. 2004)."""
+    """Map float to uint with saving order (based on Lindstrom et al. 2004).
+
+    Both directions accept an optional preallocated `out` array (or array
+    object) of matching shape and dtype which is filled and returned.
+    """
 
     name = "Lindstrom"
 
     @staticmethod
-    def map(floatarray):
+    def map(floatarray, out=None):
         if not isinstance(floatarray, FloatArray):
             err_type = "Expected FloatArray, got {}".format(type(floatarray))
             raise TypeError(err_type)
         if floatarray.array.dtype in (np.float32,):
-            length, d = 32, np.uint32
+            d = np.uint32
         elif floatarray.array.dtype in (np.float64, float,):
-            length, d = 64, np.uint64
+            d = np.uint64
         else:
             err_msg = 'Expected 32 or 64 bits, got {}'.format(floatarray.array.dtype)
             raise TypeError(err_msg)
-        data = _vlindstrom(floatarray.array, length).astype(d)
+        out = _output(out, floatarray.array.shape, d)
+        data = _lindstrom_array(floatarray.array, out)
         return IntegerArray(data)
 
     @staticmethod
-    def revmap(integerarray):
+    def revmap(integerarray, out=None):
         if not isinstance(integerarray, IntegerArray):
             err_type = "Expected IntegerArray, got {}".format(type(integerarray))
             raise TypeError(err_type)
         if integerarray.array.dtype in (np.int32, np.uint32):
-            length, d = 32, np.float32
+            d = np.float32
         elif integerarray.array.dtype in (np.int64, np.uint64, int,):
-            length, d = 64, np.float64
+            d = np.float64
         else:
             err_msg = 'Expected 32 or 64 bits, got {}'.format(integerarray.array.dtype)
             raise TypeError(err_msg)
-        data = _v_rev_lindstrom(integerarray.array, length).astype(d)
-        return FloatArray.from_numpy(data)
+        out = _output(out, integerarray.array.shape, d)
+        data = _rev_lindstrom_array(integerarray.array, out)
+        return FloatArray(data)
+
 
+def _lindstrom_array(farr, out):
+    """Lindstrom mapping of a whole float array into the uint array `out`.
 
-def _rev_lindstrom(value, length):
-    result = ba(uintbe=value, length=length)# ^ ba(floatbe=2, length=length)
-    if result.bin[0] == "1":
-        result.invert(0)
-    else:
-        result.invert()
-    return result.floatbe
-_v_rev_lindstrom = np.frompyfunc(_rev_lindstrom, 2, 1)
+    The sign bit is broadcast via an arithmetic shift, which gives a mask
+    inverting all bits of negative and only the sign bit of positive values.
+    """
+    bits = farr.dtype.itemsize * 8
+    sint = 'int{}'.format(bits)
+    np.right_shift(farr.view(sint), bits - 1, out=out.view(sint))
+    np.bitwise_or(out, out.dtype.type(1 << (bits - 1)), out=out)
+    np.bitwise_xor(out, farr.view(out.dtype), out=out)
+    return out
 
 
-def _lindstrom(value, length):
-    result = ba(floatbe=value, length=length)# ^ ba(floatbe=2, length=length)
-    if value < 0:
-        result.invert()
-    else:
-        result.invert(0)
-    return result.uintbe
-_vlindstrom = np.frompyfunc(_lindstrom, 2, 1)
+def _rev_lindstrom_array(iarr, out):
+    """Inverse of `_lindstrom_array` writing into the float array `out`."""
+    bits = iarr.dtype.itemsize * 8
+    sint, uint = 'int{}'.format(bits), 'uint{}'.format(bits)
+    mask = out.view(uint)
+    np.right_shift(iarr.view(sint), bits - 1, out=mask.view(sint))
+    np.invert(mask, out=mask)
+    np.bitwise_or(mask, mask.dtype.type(1 << (bits - 1)), out=mask)
+    np.bitwise_xor(mask, iarr.view(uint), out=mask)
+    return out
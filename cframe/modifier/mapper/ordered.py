@@ -4,29 +4,31 @@
 
 
 from cframe.backend.mappermod import BaseMapper
+from cframe.modifier.mapper.lindstrom import _lindstrom_array, _rev_lindstrom_array
 from cframe.objects.arrays.floatarray import FloatArray  # Input
 from cframe.objects.arrays.integerarray import IntegerArray  # Output
-import numpy as np
-from bitstring import BitArray as ba
+from cframe.toolbox import get_bits, _output
 
 
 class Ordered(BaseMapper):
-    """Map float to int with saving order (based on Lindstrom et al. 2004)."""
+    """Map float to int with saving order (based on Lindstrom et al. 2004).
+
+    Works on float32 and float64 arrays. Both directions accept an optional
+    preallocated `out` array of matching shape and dtype.
+    """
 
     name = "Order"
 
     @staticmethod
-    def map(floatarray):
-        data = np.where(floatarray.array > 0,
-                        floatarray.array.view('uint32') + 2**31,
-                        ~floatarray.array.view('uint32'))
+    def map(floatarray, out=None):
+        bits = get_bits(floatarray.array)
+        out = _output(out, floatarray.array.shape, 'uint{}'.format(bits))
+        data = _lindstrom_array(floatarray.array, out)
         return IntegerArray(data)
 
     @staticmethod
-    def revmap(integerarray):
-        data = np.where(integerarray.array > 2**31,
-                        (integerarray.array - 2**31).astype('uint32').view('float32'),
-                        (~integerarray.array).astype('uint32').view('float32'))
-        # TODO Check why np.nan values are mapped to the value below
-        data[data == 5.8774704e-39] = np.nan
-        return FloatArray.from_numpy(data)
+    def revmap(integerarray, out=None):
+        bits = get_bits(integerarray.array)
+        out = _output(out, integerarray.array.shape, 'float{}'.format(bits))
+        data = _rev_lindstrom_array(integerarray.array, out)
+        return FloatArray(data)
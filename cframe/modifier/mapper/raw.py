@@ -2,26 +2,31 @@
 # coding: utf-8
 """Mapper modifier to transform FloatArray to IntegerArray."""
 
-import struct
 from cframe.backend.mappermod import BaseMapper
+from cframe.modifier.mapper.rawbinary import _reinterpret
 from cframe.objects.arrays.floatarray import FloatArray  # Input
 from cframe.objects.arrays.integerarray import IntegerArray  # Output
-import numpy as np
+from cframe.toolbox import get_bits
 
 
 class Raw(BaseMapper):
     """
     Raw binary mapper. Reads float binary and interprets it as integer.
+
+    Works on float32 and float64 arrays. Both directions accept an optional
+    preallocated `out` array of matching shape and dtype.
     """
 
     name = "Raw"
 
     @staticmethod
-    def map(floatarray):
-        data = floatarray.array.view('int32').copy()
+    def map(floatarray, out=None):
+        bits = get_bits(floatarray.array)
+        data = _reinterpret(floatarray.array, 'int{}'.format(bits), out)
         return IntegerArray(data)
 
     @staticmethod
-    def revmap(integerarray):
-        data = integerarray.array.view('float32').copy()
-        return FloatArray.from_numpy(data)
+    def revmap(integerarray, out=None):
+        bits = get_bits(integerarray.array)
+        data = _reinterpret(integerarray.array, 'float{}'.format(bits), out)
+        return FloatArray(data)
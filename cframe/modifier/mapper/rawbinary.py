@@ -2,52 +2,68 @@
 # coding: utf-8
 """Mapper modifier to transform FloatArray to IntegerArray."""
 
-import struct
 from cframe.backend.mappermod import BaseMapper
 from cframe.objects.arrays.floatarray import FloatArray  # Input
 from cframe.objects.arrays.integerarray import IntegerArray  # Output
 import numpy as np
+from cframe.toolbox import _output
 
 
 class RawBinary(BaseMapper):
     """
     Raw binary mapper. Reads float binary and interprets it as integer.
+
+    The integer is the big-endian interpretation of the float bytes, which
+    is the IEEE bit pattern itself. With `inplace=True` the input buffer is
+    reused (zero-copy), otherwise the result is written into `out` or a
+    new array.
     """
 
     name = "RawBinary"
 
     @staticmethod
-    def map(floatarray):
+    def map(floatarray, out=None, inplace=False):
         if not isinstance(floatarray, FloatArray):
             err_type = "Expected FloatArray, got {}".format(type(floatarray))
             raise TypeError(err_type)
         if floatarray.array.dtype in (np.float32,):
-            i, o, d = ('>f', '>l', np.int32)
+            d = np.int32
         elif floatarray.array.dtype in (np.float64, float,):
-            i, o, d = ('>d', '>Q', np.int64)
+            d = np.int64
         else:
             err_msg = 'Expected 32 or 64 bits, got {}'.format(floatarray.array.dtype)
             raise TypeError(err_msg)
-        data = _vraw(floatarray.array, i, o).astype(d)
+        data = _reinterpret(floatarray.array, d, out, inplace)
         return IntegerArray(data)
 
     @staticmethod
-    def revmap(integerarray):
+    def revmap(integerarray, out=None, inplace=False):
         if not isinstance(integerarray, IntegerArray):
             err_type = "Expected IntegerArray, got {}".format(type(integerarray))
             raise TypeError(err_type)
         if integerarray.array.dtype in (np.int32, np.uint32):
-            i, o, d = ('>l', '>f', np.float32)
+            d = np.float32
         elif integerarray.array.dtype in (np.int64, np.uint64, int,):
-            i, o, d = ('>Q', '>d', np.float64)
+            d = np.float64
         else:
             err_msg = 'Expected 32 or 64 bits, got {}'.format(integerarray.array.dtype)
             raise TypeError(err_msg)
-        data = _vraw(integerarray.array, i, o).astype(d)
-        return FloatArray.from_numpy(data)
-    
-
-def _raw(value, itype, otype):
-    s = struct.pack(itype, value)
-    return struct.unpack(otype, s)[0]
-_vraw = np.vectorize(_raw)
\ No newline at end of file
+        data = _reinterpret(integerarray.array, d, out, inplace)
+        return FloatArray(data)
+
+
+def _reinterpret(arr, dtype, out=None, inplace=False):
+    """Reinterpret the bits of `arr` as native `dtype` of the same size.
+
+    Arrays in native byte order are only viewed (and copied unless
+    `inplace`). Arrays in non-native byte order get their bytes swapped
+    once, vectorized, either in their own buffer or while copying.
+    """
+    native = np.dtype(dtype)
+    if inplace:
+        if not arr.dtype.isnative:
+            arr.byteswap(inplace=True)
+        return arr.view(native)
+    out = _output(out, arr.shape, native)
+    np.copyto(out, arr.view(native.newbyteorder(arr.dtype.byteorder)))
+    return out
@@ -6,9 +6,19 @@ These hashing functions can be build using different
 atomic building blocks called Select, Fold, Shift, Xor. If no
 input is given the methods fall back to a default mode
 which is configured to just pass along the value.
+
+Each block emits integer bit operations (`_code`) which `ContextHash`
+compiles into one function for single histories and one for whole
+numpy arrays of histories. Values are expected to have at most 64 bits.
 """
 
-from collections import Iterable
+from collections.abc import Iterable
+from functools import partial, reduce
+from operator import xor
+from cframe.toolbox.bitops import bit_length
+import numpy as np
+
+_MAXBITS = 64  # Width assumed for input values
 
 
 class BaseContext:
@@ -54,8 +64,20 @@ class BaseContext:
     def default(bits):
         raise NotImplementedError("Not implemented!")
 
+    def _code(self, var, width, batch):
+        """Statements transforming `var` of `width` bits, and the new width."""
+        raise NotImplementedError("Not implemented!")
+
+    def __call__(self, num):
+        if not hasattr(self, '_scalar'):
+            lines, _ = self._code('t', _MAXBITS, batch=False)
+            self._scalar = _compile(['t = int(t)'] + lines + ['return t'],
+                                    't', _SCALAR)
+        return self._scalar(num)
+
     def __repr__(self):
-        return "{sym}{length}:{bits}".format(**self.__dict__)
+        return "{sym}{length}:{bits}".format(
+            **{k: v for k, v in self.__dict__.items() if not k.startswith('_')})
 
 
 class Select(BaseContext):
@@ -72,15 +94,17 @@ class Select(BaseContext):
         assert bits in [32, 64], "Wrong bits."
         return '>', bits
 
-    def __call__(self, num):
-        # LOGG.info("%s of %s", self, bin(num))
+    def _code(self, var, width, batch):
         if self.sym == ">":
-            part = (1 << self.length) - 1
-            result = part & num
-        elif self.sym == "<":
-            result = int(bin(num)[2:self.length], 2)
-        # LOGG.info("%s of %s = %s", self, num, result)
-        return result
+            return ['{0} = {0} & {1}'.format(var, (1 << self.length) - 1)], \
+                min(width, self.length)
+        # Like bin(num)[2:length]: the first length - 2 significant bits
+        keep = self.length - 2
+        if keep < 1:
+            raise ValueError("Expected Select('<n') with n > 2, got {}".format(self))
+        return ['bl = bitlen({})'.format(var),
+                '{0} = {0} >> (bl - minimum(bl, {1}))'.format(var, keep)], \
+            min(width, keep)
 
 
 class Fold(BaseContext):
@@ -98,21 +122,23 @@ class Fold(BaseContext):
         assert bits in [32, 64], "Wrong bits."
         return '>', bits
 
-    def __call__(self, num):
-        binary = bin(num)[2:]
+    def _code(self, var, width, batch):
+        if self.length < 1:
+            raise ValueError("Expected Fold length > 0, got {}".format(self))
+        mask = (1 << self.length) - 1
+        shifts = range(0, max(width, 1), self.length)
         if self.sym == "<":
-            tmp = [binary[i:i+self.length]
-                   for i in range(len(binary))][::self.length]
+            # Chunks start at the most significant bit, the last one keeps
+            # the remaining low bits
+            lines = ['r = bitlen({}) % {}'.format(var, self.length),
+                     'u = {} >> r'.format(var)]
+            terms = ' ^ '.join('(u >> {})'.format(x) for x in shifts)
+            lines.append('{0} = ({0} & ((1 << r) - 1)) ^ (({1}) & {2})'.format(
+                var, terms, mask))
         else:
-            tmp = [binary[::-1][i:i+self.length][::-1]
-                   for i in range(len(binary))][::self.length]
-        splits = [x for x in tmp if x]
-        return self._xor(splits)
-
-    def _xor(self, arr):
-        if len(arr) == 1:
-            return int(arr[0], 2)
-        return int(arr[-1], 2) ^ self._xor(arr[:-1])
+            terms = ' ^ '.join('({} >> {})'.format(var, x) for x in shifts)
+            lines = ['{0} = ({1}) & {2}'.format(var, terms, mask)]
+        return lines, min(width, self.length)
 
 
 class Shift(BaseContext):
@@ -129,10 +155,16 @@ class Shift(BaseContext):
         assert bits in [32, 64], "Wrong bits."
         return '>', 0
 
-    def __call__(self, num):
+    def _code(self, var, width, batch):
         if self.sym == '<':
-            return num << self.length
-        return num >> self.length
+            width += self.length
+            if batch and self.length >= _MAXBITS:
+                return ['{0} = {0} & 0'.format(var)], width
+            return ['{0} = {0} << {1}'.format(var, self.length)], width
+        if self.length >= _MAXBITS:
+            return ['{0} = {0} & 0'.format(var)], 0
+        return ['{0} = {0} >> {1}'.format(var, self.length)], \
+            max(width - self.length, 0)
 
 
 class Xor:
@@ -143,10 +175,7 @@ class Xor:
     """
 
     def __call__(self, arr):
-        x = Xor()
-        if len(arr) != 1:
-            return arr[0] ^ x(arr[1:])
-        return arr[0]
+        return reduce(xor, arr)
 
 
 class Split(BaseContext):
@@ -166,7 +195,7 @@ class Split(BaseContext):
 
     def __call__(self, num):
         complSym = '>' if self.sym == '<' else '<'
-        binlength = len(bin(num)[2:])
+        binlength = max(int(num).bit_length(), 1)
         complLen = binlength - self.length
         if complLen < 0:
             complLen = 0
@@ -179,6 +208,10 @@ class Split(BaseContext):
 
 class ContextHash:
     """ Main factory class for building hashing functions.
+
+    The Select, Fold and Shift blocks of each history element, the Xor and
+    the last Select are compiled once into integer bit operations. Call
+    the object with one history or use `hash_all` for a whole array.
     """
 
     def __init__(self, R=None, F=None, S=None, L=None, bits=32):
@@ -200,11 +233,13 @@ class ContextHash:
             Bit length
         """
         assert self._check(R, F, S), "Sizes don't fit."
-        self.R = [Select(x, bits) for x in R] if R else [None]*self.ctx
-        self.F = [Fold(x, bits) for x in F] if F else [None]*self.ctx
-        self.S = [Shift(x, bits) for x in S] if S else [None]*self.ctx
+        self.R = [Select(x, bits) for x in R] if R else [Select(None, bits)]*self.ctx
+        self.F = [Fold(x, bits) for x in F] if F else [Fold(None, bits)]*self.ctx
+        self.S = [Shift(x, bits) for x in S] if S else [Shift(None, bits)]*self.ctx
         self.L = Select(L)
         self.bits = bits
+        self._hash, _ = self._build(batch=False)
+        self._batch, self._width = self._build(batch=True)
 
     def __repr__(self):
         return ("Context: {ctx}\nSelect:\t{R}" +
@@ -215,15 +250,57 @@ class ContextHash:
         self.ctx = ctx[0] if ctx else 1
         return all([ctx[0] == x for x in ctx])
 
+    def _build(self, batch):
+        """Compile the hash of one history (or of columns of arrays)."""
+        names = ['v{}'.format(i) for i in range(self.ctx)]
+        lines, width = [], 0
+        for i, var in enumerate(names):
+            term = _MAXBITS
+            if not batch:
+                lines.append('{0} = int({0})'.format(var))
+            for block in (self.R[i], self.F[i], self.S[i]):
+                code, term = block._code(var, term, batch)
+                lines += code
+            width = max(width, term)
+        lines.append('h = ' + ' ^ '.join(names))
+        code, _ = self.L._code('h', width, batch)
+        lines += code + ['return h']
+        return _compile(lines, ', '.join(names), _BATCH if batch else _SCALAR), width
+
     def __call__(self, history):
         assert isinstance(history, Iterable), "History not iterable"
         if len(history) != len([x for x in history if x]):
             return None
         assert len(history) == self.ctx, "History not same length as context."
-        x, res = Xor(), []
-        for i, v in enumerate(history):
-            tmp = self.R[i](v)
-            tmp = self.F[i](tmp)
-            tmp = self.S[i](tmp)
-            res.append(tmp)
-        return self.L(x(res))
+        return self._hash(*history)
+
+    def hash_all(self, histories):
+        """Hash every row of the (n, ctx) integer array `histories`.
+
+        Returns a masked uint64 array, rows containing a zero are masked
+        (the single history version returns None for them).
+        """
+        histories = np.asarray(histories)
+        if histories.ndim != 2 or histories.shape[1] != self.ctx:
+            err_msg = "Expected array of shape (n, {}), got {}".format(
+                self.ctx, histories.shape)
+            raise ValueError(err_msg)
+        if self.L.sym == '<' and self._width > _MAXBITS:
+            err_msg = "Context of {} bits exceeds {} bits for '<' selection".format(
+                self._width, _MAXBITS)
+            raise ValueError(err_msg)
+        columns = histories.astype(np.uint64).T
+        result = np.broadcast_to(self._batch(*columns), histories.shape[:1])
+        return np.ma.masked_array(result, mask=(histories == 0).any(axis=1))
+
+
+def _compile(lines, args, namespace):
+    """Function with arguments `args` and body `lines`, executed in `namespace`."""
+    source = 'def _f({}):\n    {}\n'.format(args, '\n    '.join(lines))
+    scope = dict(namespace)
+    exec(compile(source, '<context>', 'exec'), scope)
+    return scope['_f']
+
+
+_SCALAR = {'bitlen': int.bit_length, 'minimum': min}
+_BATCH = {'bitlen': partial(bit_length, dtype=np.uint64), 'minimum': np.minimum}
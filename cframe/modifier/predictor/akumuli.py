@@ -3,6 +3,7 @@
 """Predictor classes."""
 
 from cframe.backend.predictormod import CorePredictor
+import numpy as np
 
 
 class Akumuli(CorePredictor):
@@ -31,5 +32,141 @@ class Akumuli(CorePredictor):
         result = (shifted ^ (val >> self._ctx)) & self._mask
         return int(result)  # TODO: Somehow a transformation to int is necessary. Why?
 
+    def predict_all(self, data):
+        """Predictions for the sequence `data` without a per value loop.
+
+        The hash only depends on the last few values (older ones are
+        shifted out of `mask`), so all hashes are computed at once. Each
+        prediction is then the last value seen with the same hash.
+        """
+        data = np.asarray(data).ravel()
+        hashes = _hashes(data, self._last_hash, self._mask, self._ctx)
+        self._last_hash = int(hashes[-1])
+        return _lookup(data, hashes[:-1], self._table)
+
+    def reconstruct_all(self, residuals, subtractor):
+        """Values of the sequence `residuals`, the inverse of `predict_all`.
+
+        Every hash depends on the value just recovered, so the hashes are
+        still found in one loop. It only follows the bits of the values up
+        to the top of the context (for xor just the context), the values
+        themselves are accumulated per hash afterwards. See
+        benchmarks/akumuli.py: about 20-27x faster than the predict/update
+        protocol for 32 bit values, 9-17x for 64 bit ones.
+        """
+        ufunc = getattr(subtractor, 'ufunc', None)
+        if ufunc not in (np.bitwise_xor, np.subtract):
+            return NotImplemented
+        residuals = np.asarray(residuals)
+        hashes, self._last_hash = _rev_hashes(residuals.ravel(), self._table, self._last_hash,
+                                              self._mask, self._ctx, ufunc is np.bitwise_xor)
+        values = _accumulate(residuals.ravel(), hashes, self._table, ufunc is np.bitwise_xor)
+        return values.reshape(residuals.shape)
+
     def __repr__(self):
-        return "{} (bits {})".format(self.name, self._bits)
\ No newline at end of file
+        return "{} (bits {})".format(self.name, self._bits)
+
+
+def _hashes(data, last_hash, mask, ctx):
+    """Hash before each value of `data` and after the last one.
+
+    Unrolls `((hash << 5) ^ (val >> ctx)) & mask` into an xor of the
+    shifted context of the values still inside the mask.
+    """
+    context = ((data >> ctx) & mask).astype(np.int64)
+    hashes = np.zeros(data.size + 1, np.int64)
+    for step in range(min(-(-mask.bit_length() // 5), data.size + 1)):
+        hashes[step] ^= (last_hash << 5 * step) & mask
+        hashes[step + 1:] ^= (context[:data.size - step] << 5 * step) & mask
+    return hashes
+
+
+def _lookup(data, hashes, table):
+    """Last value of `data` (or `table` entry) before each step with the same hash.
+
+    The table is updated in place with the last value of each hash.
+    """
+    order = np.argsort(hashes, kind='stable')
+    ordered = hashes[order]
+    first = np.ones(data.size, bool)
+    first[1:] = ordered[1:] != ordered[:-1]
+    result = np.empty_like(data)
+    result[order[~first]] = data[order[:-1][~first[1:]]]
+    result[order[first]] = np.array(table, data.dtype)[ordered[first]]
+    last = np.ones(data.size, bool)
+    last[:-1] = first[1:]
+    for key, value in zip(ordered[last].tolist(), data[order[last]].tolist()):
+        table[key] = value
+    return result
+
+
+def _rev_hashes(residuals, table, last_hash, mask, ctx, xor):
+    """Hash before each value recovered from `residuals` and the one after the last.
+
+    Only the bits of the values up to the top of the context are followed,
+    for xor just the context itself. Differences wrap around like the
+    integer dtype of `residuals`.
+    """
+    top = ctx + mask.bit_length()
+    if xor:
+        residuals = (residuals >> ctx) & mask
+        partial = [(x >> ctx) & mask for x in table]
+    elif top <= 8 * residuals.dtype.itemsize:
+        low = (1 << top) - 1
+        residuals = residuals & residuals.dtype.type(low)
+        partial = [x & low for x in table]
+    else:
+        return _rev_wrapped(residuals, table, last_hash, mask, ctx)
+    shifted = [(x << 5) & mask for x in range(mask + 1)]
+    hashes = []
+    append = hashes.append
+    if xor:
+        for res in residuals.tolist():
+            append(last_hash)
+            partial[last_hash] = val = partial[last_hash] ^ res
+            last_hash = shifted[last_hash] ^ val
+    else:
+        for res in residuals.tolist():
+            append(last_hash)
+            partial[last_hash] = val = (partial[last_hash] - res) & low
+            last_hash = shifted[last_hash] ^ (val >> ctx)
+    return np.array(hashes, np.min_scalar_type(mask)), last_hash
+
+
+def _rev_wrapped(residuals, table, last_hash, mask, ctx):
+    """`_rev_hashes` of differences on the full values, contexts reaching the sign bit."""
+    bits = 8 * residuals.dtype.itemsize
+    half = 1 << (bits - 1) if residuals.dtype.kind == 'i' else 0
+    wrap = (1 << bits) - 1
+    table = list(table)
+    hashes = []
+    append = hashes.append
+    for res in residuals.tolist():
+        append(last_hash)
+        table[last_hash] = val = ((table[last_hash] - res + half) & wrap) - half
+        last_hash = ((last_hash << 5) ^ (val >> ctx)) & mask
+    return np.array(hashes, np.min_scalar_type(mask)), last_hash
+
+
+def _accumulate(residuals, hashes, table, xor):
+    """Values of `residuals` given the hash of each step, updates `table` in place.
+
+    A value is the last one (or the `table` entry) of its hash combined
+    with its residual, i.e. the entry combined with the running xor or
+    sum of the residuals of that hash.
+    """
+    order = np.argsort(hashes, kind='stable')
+    ordered = hashes[order]
+    first = np.ones(residuals.size, bool)
+    first[1:] = ordered[1:] != ordered[:-1]
+    inverse = np.bitwise_xor if xor else np.subtract
+    step = residuals[order]
+    total = (np.bitwise_xor if xor else np.add).accumulate(step)
+    before = inverse(total, step)[first][np.cumsum(first) - 1]
+    result = np.empty_like(residuals)
+    result[order] = inverse(np.array(table, residuals.dtype)[ordered], inverse(total, before))
+    last = np.ones(residuals.size, bool)
+    last[:-1] = first[1:]
+    for key, value in zip(ordered[last].tolist(), result[order[last]].tolist()):
+        table[key] = value
+    return result
@@ -2,6 +2,10 @@
 # coding: utf-8
 
 from cframe.backend.predictormod import MixedPredictor
+import numpy as np
+
+_WARMUP = 2  # Steps through the scalar protocol until members use the data dtype
+_CHUNK = 2**16  # Steps per block of running vote counts
 
 
 class MostRight(MixedPredictor):
@@ -18,23 +22,43 @@ class MostRight(MixedPredictor):
         return self.predictors[self.overallbest].predict()
 
     def update(self, val):
-        # everyone makes their predictions
-        predictions = {k: v.predict() for k, v in self.predictors.items()}
-
-        # calculate error, sort by decreasing errors
-        errors = {k: (val - v) if val>v else (v-val) for k, v in predictions.items()}
-        self.lastbest = sorted(
-            errors.items(), key=lambda x: x[1], reverse=False)[0][0]
+        # smallest error wins, first predictor on ties
+        self.lastbest = _winner(self.predictors, val)
 
         # update overall best
         self.counter[self.lastbest] += 1
-        self.overallbest = sorted(
-            self.counter.items(), key=lambda x: x[1], reverse=True)[0][0]
+        self.overallbest = max(self.counter, key=self.counter.get)
 
         # update predictors
         for _, pred in self.predictors.items():
             pred.update(val)
 
+    def predict_all(self, data):
+        """Predictions for the sequence `data` with all members at once.
+
+        The overall best before each step is the argmax of the running vote
+        counts, which are built blockwise from the per step winners.
+        """
+        data, result, rest = _warmup(self, data)
+        if rest.size:
+            predictions = _member_predictions(self.predictors, rest)
+            winners = _winners(predictions, rest)
+            counts = np.array([self.counter[k] for k in sorted(self.counter)])
+            before = np.empty(rest.size, np.intp)
+            best = self.overallbest
+            members = np.arange(len(counts))[:, None]
+            for lo in range(0, rest.size, _CHUNK):
+                hi = min(lo + _CHUNK, rest.size)
+                running = np.cumsum(winners[lo:hi] == members, axis=1) + counts[:, None]
+                overall = np.argmax(running, axis=0)
+                before[lo] = best
+                before[lo + 1:hi] = overall[:-1]
+                best, counts = overall[-1], running[:, -1]
+            result[data.size - rest.size:] = predictions[before, np.arange(rest.size)]
+            self.counter = {k: int(v) for k, v in enumerate(counts)}
+            self.lastbest, self.overallbest = int(winners[-1]), int(best)
+        return result
+
 
 class LastBest(MixedPredictor):
 
@@ -49,14 +73,81 @@ class LastBest(MixedPredictor):
         return self.predictors[self.lastbest].predict()
 
     def update(self, val):
-        # everyone makes their predictions
-        predictions = {k: v.predict() for k, v in self.predictors.items()}
-
-        # calculate error, sort by decreasing errors
-        errors = {k: (val - v) if val>v else (v-val) for k, v in predictions.items()}
-        self.lastbest = sorted(
-            errors.items(), key=lambda x: x[1], reverse=False)[0][0]
+        # smallest error wins, first predictor on ties
+        self.lastbest = _winner(self.predictors, val)
 
         # update predictors
         for _, pred in self.predictors.items():
             pred.update(val)
+
+    def predict_all(self, data):
+        """Predictions for the sequence `data` with all members at once."""
+        data, result, rest = _warmup(self, data)
+        if rest.size:
+            predictions = _member_predictions(self.predictors, rest)
+            winners = _winners(predictions, rest)
+            before = np.empty(rest.size, np.intp)
+            before[0] = self.lastbest
+            before[1:] = winners[:-1]
+            result[data.size - rest.size:] = predictions[before, np.arange(rest.size)]
+            self.lastbest = int(winners[-1])
+        return result
+
+
+def _warmup(ensemble, data):
+    """Run the first steps through the scalar protocol.
+
+    Returns the flat data, the result array with the first predictions
+    and the remaining data.
+    """
+    data = np.asarray(data).ravel()
+    result = np.empty_like(data)
+    for i in range(min(_WARMUP, data.size)):
+        result[i] = ensemble.predict()
+        ensemble.update(data[i])
+    return data, result, data[_WARMUP:]
+
+
+def _member_predictions(predictors, data):
+    """(n_predictors, n) array with the predictions of every member."""
+    result = np.empty((len(predictors), data.size), data.dtype)
+    for k in sorted(predictors):
+        pred = predictors[k]
+        if getattr(pred, 'predict_all', None) is not None:
+            result[k] = pred.predict_all(data)
+        else:
+            for i, value in enumerate(data):
+                result[k, i] = pred.predict()
+                pred.update(value)
+    return result
+
+
+def _winner(predictors, val):
+    """Member with the smallest absolute error for the single value `val`.
+
+    Predictions are cast to the dtype of `val` like in `_member_predictions`,
+    so the scalar protocol picks the same members as `_winners`.
+    """
+    val = np.asarray(val)
+    predictions = np.array([np.asarray(predictors[k].predict()).astype(val.dtype)
+                            for k in sorted(predictors)], val.dtype)
+    return int(np.argmin(_errors(predictions, val)))
+
+
+def _winners(predictions, data):
+    """Member with the smallest absolute error for each step."""
+    return np.argmin(_errors(predictions, data), axis=0)
+
+
+def _errors(predictions, data):
+    """Absolute error of the `predictions` for `data`.
+
+    Signed values are mapped order preserving to unsigned ones first, so
+    the error is exact for the full range of the dtype.
+    """
+    if data.dtype.kind == 'i':
+        unsigned = np.dtype('uint{}'.format(8 * data.dtype.itemsize))
+        sign = unsigned.type(1 << (8 * data.dtype.itemsize - 1))
+        predictions = predictions.view(unsigned) ^ sign
+        data = data.view(unsigned) ^ sign
+    return np.where(data > predictions, data - predictions, predictions - data)
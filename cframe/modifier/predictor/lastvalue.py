@@ -3,6 +3,7 @@
 """Predictor classes."""
 
 from cframe.backend.predictormod import CorePredictor
+import numpy as np
 
 
 class LastValue(CorePredictor):
@@ -18,4 +19,28 @@ class LastValue(CorePredictor):
         self._prev = val
 
     def predict(self):
-        return self._prev
\ No newline at end of file
+        return self._prev
+
+    def predict_all(self, data):
+        """Predictions for the sequence `data` by shifting it one step."""
+        data = np.asarray(data)
+        result = np.empty_like(data)
+        if data.size:
+            result[0] = self._prev
+            result[1:] = data[:-1]
+            self._prev = data[-1]
+        return result
+
+    def reconstruct_all(self, residuals, subtractor):
+        """Values of the sequence `residuals` as prefix scan of the subtractor."""
+        ufunc = getattr(subtractor, 'ufunc', None)
+        if ufunc is None:
+            return NotImplemented
+        residuals = np.asarray(residuals)
+        values = np.empty(residuals.size + 1, residuals.dtype)
+        values[0] = self._prev
+        values[1:] = residuals
+        ufunc.accumulate(values, out=values)
+        if residuals.size:
+            self._prev = values[-1]
+        return values[1:]
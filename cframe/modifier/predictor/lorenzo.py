@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+# coding: utf-8
+"""Predictor classes."""
+
+from itertools import combinations
+from cframe.backend.predictormod import NDPredictor
+from cframe.objects.arrays.integerarray import IntegerArray
+from cframe.objects.arrays.residualarray import ResidualArray
+from cframe.objects.arrays.predictionarray import PredictionArray
+from cframe.toolbox import _check_input
+import numpy as np
+
+
+class Lorenzo(NDPredictor):
+    """Lorenzo (parallelogram) prediction on N dimensional grids.
+
+    Each cell is predicted from its neighbours with lower indices by
+    inclusion-exclusion, e.g. a[i-1, j] + a[i, j-1] - a[i-1, j-1] in 2-D.
+    Cells outside of the grid count as zero and all arithmetic wraps
+    around like the integer dtype.
+    """
+
+    name = 'Lorenzo'
+
+    def __init__(self, *args, **kwargs):
+        _, _ = args, kwargs
+
+    def predict(self, integerarray):
+        """PredictionArray of the whole grid via shifted array stencils."""
+        integerarray = _check_input(integerarray, IntegerArray)
+        arr = integerarray.array
+        padded = np.zeros(tuple(x + 1 for x in arr.shape), arr.dtype)
+        padded[(slice(1, None),) * arr.ndim] = arr
+        result = np.zeros_like(arr)
+        for sign, subset in _stencil(arr.ndim):
+            view = padded[tuple(slice(0, -1) if axis in subset else slice(1, None)
+                                for axis in range(arr.ndim))]
+            (np.add if sign > 0 else np.subtract)(result, view, out=result)
+        return PredictionArray(result)
+
+    def update(self, *args, **kwargs):
+        """The prediction only depends on the grid, there is no state."""
+        _, _ = args, kwargs
+
+    def reconstruct(self, residualarray, subtractor):
+        """IntegerArray from the residuals of `predict` and `subtractor`.
+
+        For the difference subtractor the grid is a cumulative sum of the
+        negated residuals along every axis. Other subtractors are inverted
+        wavefront by wavefront: all cells with the same index sum only
+        depend on earlier wavefronts.
+        """
+        residualarray = _check_input(residualarray, ResidualArray)
+        residuals = residualarray.array
+        ufunc = getattr(subtractor, 'ufunc', None)
+        if ufunc is np.subtract:
+            result = np.negative(residuals)
+            for axis in range(result.ndim):
+                np.cumsum(result, axis=axis, dtype=result.dtype, out=result)
+            return IntegerArray(result)
+        if ufunc is None:
+            err_msg = "Expected subtractor with ufunc, got {}".format(subtractor)
+            raise TypeError(err_msg)
+        return IntegerArray(_wavefront(residuals, ufunc))
+
+
+def _stencil(ndim):
+    """Signs and axes subsets of the Lorenzo stencil."""
+    return [(1 if size % 2 else -1, subset)
+            for size in range(1, ndim + 1)
+            for subset in combinations(range(ndim), size)]
+
+
+def _wavefront(residuals, ufunc):
+    """Invert the Lorenzo prediction hyperplane by hyperplane."""
+    shape = residuals.shape
+    padshape = tuple(x + 1 for x in shape)
+    padded = np.zeros(int(np.prod(padshape)), residuals.dtype)
+    strides = np.cumprod((1,) + padshape[:0:-1])[::-1]
+    offsets = [(sign, int(sum(strides[a] for a in subset)))
+               for sign, subset in _stencil(len(shape))]
+
+    # Flat cells of the padded grid sorted by their index sum
+    coords = np.indices(shape).reshape(len(shape), -1)
+    order = np.argsort(coords.sum(axis=0), kind='stable')
+    cells = np.dot(strides, coords[:, order] + 1)
+    bounds = np.cumsum(np.bincount(coords.sum(axis=0)))[:-1]
+    flat = residuals.ravel()[order]
+
+    for idx, res in zip(np.split(cells, bounds), np.split(flat, bounds)):
+        prediction = np.zeros_like(res)
+        for sign, offset in offsets:
+            (np.add if sign > 0 else np.subtract)(prediction, padded[idx - offset],
+                                                  out=prediction)
+        padded[idx] = ufunc(prediction, res)
+    padded = padded.reshape(padshape)
+    return padded[(slice(1, None),) * len(shape)].copy()
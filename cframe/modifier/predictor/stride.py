@@ -3,6 +3,7 @@
 """Predictor classes."""
 
 from cframe.backend.predictormod import CorePredictor
+import numpy as np
 
 
 class Stride(CorePredictor):
@@ -19,4 +20,50 @@ class Stride(CorePredictor):
         self._prev = val
 
     def predict(self):
-        return self._prev + self._stride
\ No newline at end of file
+        return self._prev + self._stride
+
+    def predict_all(self, data):
+        """Predictions for the sequence `data` as prev + (prev - preprev).
+
+        The first two steps go through the scalar protocol so the state
+        reaches the dtype of `data`, the rest wraps around like it.
+        """
+        data = np.asarray(data)
+        result = np.empty_like(data)
+        for i in range(min(2, data.size)):
+            result[i] = self.predict()
+            self.update(data[i])
+        if data.size > 2:
+            prev = data[1:-1]
+            np.subtract(prev, data[:-2], out=result[2:])
+            np.add(result[2:], prev, out=result[2:])
+            self._stride = data[-1] - data[-2]
+            self._prev = data[-1]
+        return result
+
+    def reconstruct_all(self, residuals, subtractor):
+        """Values of the sequence `residuals` as second order prefix sum.
+
+        Only the difference subtractor has a closed form: the strides are
+        a cumulative difference of the residuals, the values a cumulative
+        sum of the strides.
+        """
+        if getattr(subtractor, 'ufunc', None) is not np.subtract:
+            return NotImplemented
+        residuals = np.asarray(residuals)
+        result = np.empty_like(residuals)
+        for i in range(min(2, residuals.size)):
+            result[i] = self.predict()
+            result[i] = np.subtract(result[i], residuals[i])
+            self.update(result[i])
+        if residuals.size > 2:
+            steps = np.empty(residuals.size - 1, residuals.dtype)
+            steps[0] = self._stride
+            steps[1:] = residuals[2:]
+            np.subtract.accumulate(steps, out=steps)
+            steps[0] = self._prev
+            np.add.accumulate(steps, out=steps)
+            result[2:] = steps[1:]
+            self._stride = result[-1] - result[-2]
+            self._prev = result[-1]
+        return result
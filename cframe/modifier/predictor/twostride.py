@@ -3,6 +3,8 @@
 """Predictor classes."""
 
 from cframe.backend.predictormod import CorePredictor
+import numpy as np
+
 
 class TwoStride(CorePredictor):
 
@@ -21,4 +23,53 @@ class TwoStride(CorePredictor):
         self._lastStride = new_stride
 
     def predict(self):
-        return self._prev + self._bestStride
\ No newline at end of file
+        return self._prev + self._bestStride
+
+    def predict_all(self, data):
+        """Predictions for the sequence `data` with a tight stride kernel.
+
+        The strides are computed in the type the scalar `val - prev` has
+        and the selection loop emulates its wraparound on Python numbers.
+        """
+        data = np.asarray(data)
+        if not data.size:
+            return np.empty_like(data)
+        dtype = np.asarray(data[0] - self._prev).dtype
+        strides = data.astype(dtype) - np.asarray(self._prev).astype(dtype)
+        bests = _twostride(strides.tolist(), self._lastStride,
+                           self._bestStride, _absdiff(dtype))
+        result = np.empty_like(data)
+        result[:] = np.asarray(bests[:-1], dtype) + self._prev
+        self._bestStride = dtype.type(bests[-1])
+        self._lastStride = strides[-1]
+        return result
+
+
+def _twostride(strides, last, best, absdiff):
+    """Best stride before each step and after the last one."""
+    typ = float if isinstance(strides[0], float) else int
+    last, best = typ(last), typ(best)
+    bests = []
+    for new in strides:
+        bests.append(best)
+        if absdiff(new, last) < absdiff(new, best):
+            best = new
+        last = new
+    bests.append(best)
+    return bests
+
+
+def _absdiff(dtype):
+    """abs(a - b) with the wraparound of numpy scalars of `dtype`."""
+    if dtype.kind == 'f':
+        return lambda a, b: abs(a - b)
+    bits = 8 * dtype.itemsize
+    mask = (1 << bits) - 1
+    if dtype.kind == 'u':
+        return lambda a, b: (a - b) & mask
+    half = 1 << (bits - 1)
+
+    def absdiff(a, b):
+        diff = ((a - b + half) & mask) - half
+        return ((abs(diff) + half) & mask) - half
+    return absdiff
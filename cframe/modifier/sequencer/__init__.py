@@ -2,13 +2,94 @@
 # coding: utf-8
 """Sequencer modifier."""
 
+from numbers import Integral
 from cframe.objects.arrays.integerarray import IntegerArray
+from cframe.objects.sequence import IndexSequence
+from cframe.toolbox.plancache import PLANS
+import numpy as np
 
 
 def _check_input(startnode, integerarray):
     if not isinstance(integerarray, IntegerArray):
         err_msg = "Expected IntegerArray, got {}".format(type(integerarray))
         raise TypeError(err_msg)
-    if isinstance(startnode, int):
-        startnode = str(startnode + 1)  # Node was given as 'idx'
-    return startnode, integerarray
\ No newline at end of file
+    if isinstance(startnode, str):
+        startnode = int(startnode) - 1  # Node was given as 'name'
+    if not isinstance(startnode, Integral):
+        err_msg = "Expected int as startnode, got {}".format(type(startnode))
+        raise TypeError(err_msg)
+    if not 0 <= startnode < integerarray.array.size:
+        err_msg = "Startnode {} not in array of size {}".format(
+            startnode, integerarray.array.size)
+        raise ValueError(err_msg)
+    return int(startnode), integerarray
+
+
+def _index_dtype(size):
+    """Smallest index dtype for arrays of `size` cells."""
+    return np.int32 if size <= np.iinfo(np.int32).max else np.int64
+
+
+def _axes(order, ndim):
+    """Axis traversal order (outermost first) for the `order` argument."""
+    if not order or order in ('c', 'C'):
+        return tuple(range(ndim))
+    elif order in ('f', 'F'):
+        return tuple(reversed(range(ndim)))
+    elif sorted(order) == list(range(ndim)):
+        return tuple(order)
+    err_msg = "Expected 'C', 'F' or axes permutation, got {}".format(order)
+    raise ValueError(err_msg)
+
+
+def _flatten(sequencer, startnode, integerarray, order=None):
+    """IndexSequence of `integerarray` following the (cached) sequencer plan."""
+    startnode, integerarray = _check_input(startnode, integerarray)
+    shape = integerarray.array.shape
+    seq = PLANS.indices(sequencer, startnode, shape, order)
+    data = integerarray.array.ravel()[seq]
+    return IndexSequence(seq, shape, data, order=order)
+
+
+def _curve(keys, startnode):
+    """Cells sorted by their curve `keys` and rolled to begin at `startnode`."""
+    seq = np.argsort(keys, kind='stable').astype(_index_dtype(keys.size))
+    startidx = np.flatnonzero(seq == startnode)[0]
+    return np.roll(seq, -startidx)
+
+
+def _nbits(shape):
+    """Number of bits needed for the coordinates of the largest axis."""
+    return max(int(x - 1).bit_length() for x in shape) or 1
+
+
+def _dilate(x, n, bits):
+    """Spread the lowest `bits` bits of `x` to every `n`-th bit position.
+
+    Bit j is moved to position j * n in log2(bits) shift and mask steps.
+    """
+    x = x.astype(np.uint64)
+    if n == 1:
+        return x
+    step = 1 << (bits - 1).bit_length()
+    positions = list(range(bits))
+    while step > 1:
+        step >>= 1
+        shift = np.uint64(step * (n - 1))
+        move = sum(1 << p for j, p in enumerate(positions) if j & step)
+        keep = sum(1 << p for j, p in enumerate(positions) if not j & step)
+        positions = [p + int(shift) if j & step else p
+                     for j, p in enumerate(positions)]
+        x = (x & np.uint64(keep)) | ((x & np.uint64(move)) << shift)
+    return x
+
+
+def _check_curve(shape, order):
+    """Axes order of a space filling curve for arrays of `shape`."""
+    if len(shape) < 2:
+        err_msg = "Expected array with at least 2 dimensions, got {}".format(len(shape))
+        raise ValueError(err_msg)
+    if len(shape) * _nbits(shape) > 64:
+        err_msg = "Shape {} too large for 64 bit curve keys".format(shape)
+        raise ValueError(err_msg)
+    return _axes(order, len(shape))
@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+# coding: utf-8
+"""Sequencer modifier."""
+
+from cframe.modifier.sequencer import _flatten, _curve, _check_curve, _nbits, _dilate
+from cframe.backend.sequencermod import BaseSequencer
+import numpy as np
+
+_CHUNK = 2**22  # Cells per vectorized key computation
+
+
+class Hilbert(BaseSequencer):
+    """Hilbert curve output sequence for 2 and 3 dimensional arrays.
+
+    The first axis of `order` is the most significant one. Shapes which are
+    not a power of two are traversed like the enclosing cube, skipping
+    missing cells.
+    """
+
+    name = 'Hilbert'
+
+    @staticmethod
+    def flatten(startnode, integerarray, order=None):
+        return _flatten(Hilbert, startnode, integerarray, order)
+
+    @staticmethod
+    def indices(startnode, shape, order=None):
+        """Flat indices of the traversal rolled to begin at `startnode`."""
+        axes = _check_curve(shape, order)
+        bits, size = _nbits(shape), int(np.prod(shape))
+        keys = np.empty(size, np.uint64)
+        for lo in range(0, size, _CHUNK):
+            hi = min(lo + _CHUNK, size)
+            coords = np.unravel_index(np.arange(lo, hi), shape)
+            keys[lo:hi] = _hilbert_keys([coords[a] for a in axes], bits)
+        return _curve(keys, startnode)
+
+
+def _hilbert_keys(coords, bits):
+    """Hilbert index of the cells at `coords` (Skilling, 2004).
+
+    The coordinates are transformed to the transposed Hilbert index with
+    masked bit operations on whole arrays and then interleaved.
+    """
+    x = [c.astype(np.uint64) for c in coords]
+    ndim, zero = len(x), np.uint64(0)
+    q = 1 << (bits - 1)
+    while q > 1:
+        p = np.uint64(q - 1)
+        for i in range(ndim):
+            high = (x[i] & np.uint64(q)) != 0
+            t = np.where(high, zero, (x[0] ^ x[i]) & p)
+            x[0] ^= np.where(high, p, t)
+            x[i] ^= t
+        q >>= 1
+    for i in range(1, ndim):
+        x[i] ^= x[i - 1]
+    t = np.zeros_like(x[0])
+    q = 1 << (bits - 1)
+    while q > 1:
+        t ^= np.where((x[-1] & np.uint64(q)) != 0, np.uint64(q - 1), zero)
+        q >>= 1
+    keys = np.zeros_like(x[0])
+    for i in range(ndim):
+        keys |= _dilate(x[i] ^ t, ndim, bits) << np.uint64(ndim - 1 - i)
+    return keys
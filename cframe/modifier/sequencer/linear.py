@@ -2,9 +2,8 @@
 # coding: utf-8
 """Sequencer modifier."""
 
-from cframe.modifier.sequencer import _check_input
+from cframe.modifier.sequencer import _flatten, _index_dtype, _axes
 from cframe.backend.sequencermod import BaseSequencer
-from cframe.objects.sequence import IndexSequence
 import numpy as np
 
 
@@ -15,20 +14,23 @@ class Linear(BaseSequencer):
 
     @staticmethod
     def flatten(startnode, integerarray, order=None):
-        startnode, integerarray = _check_input(startnode, integerarray)
-        shape = integerarray.array.shape
-        tmpdata = np.arange(np.prod(shape)).reshape(shape)
-        nodenames = (tmpdata + 1).astype(str)
-        if not order or order in ('c', 'C'):
-            new = nodenames.copy()
-        elif order in ('f', 'F'):
-            new = np.transpose(nodenames).copy()
-        else:
-            new = np.transpose(nodenames, order).copy()
+        return _flatten(Linear, startnode, integerarray, order)
 
-        startidx = np.where(new.flat == startnode)[0][0]
-        nodelist = np.roll(new.flat, -startidx)
-        seq = nodelist.astype(np.int32) - 1
-        data = np.array([integerarray.array.flat[x] for x in seq],
-                        dtype=integerarray.array.dtype)
-        return IndexSequence(seq, shape, data, order=order)
+    @staticmethod
+    def indices(startnode, shape, order=None):
+        """Flat indices of the traversal rolled to begin at `startnode`.
+
+        The traversal runs through the axes given by `order` ('C', 'F' or
+        a permutation of the axes, outermost first) and is built from the
+        axis strides, so no intermediate node names are needed.
+        """
+        axes = _axes(order, len(shape))
+        itype = _index_dtype(int(np.prod(shape)))
+        strides = np.cumprod((1,) + shape[:0:-1])[::-1]
+        seq = np.zeros((), itype)
+        for axis in axes:
+            seq = np.add.outer(seq, np.arange(shape[axis], dtype=itype) * int(strides[axis]))
+        coords = np.unravel_index(startnode, shape)
+        startidx = np.ravel_multi_index([coords[a] for a in axes],
+                                        [shape[a] for a in axes])
+        return np.roll(seq.ravel(), -startidx)
@@ -0,0 +1,34 @@
+#!/usr/bin/env python
+# coding: utf-8
+"""Sequencer modifier."""
+
+from cframe.modifier.sequencer import _flatten, _curve, _check_curve, _nbits, _dilate
+from cframe.backend.sequencermod import BaseSequencer
+import numpy as np
+
+
+class Morton(BaseSequencer):
+    """Z-order (Morton) output sequence for 2 and 3 dimensional arrays.
+
+    The key of a cell interleaves the bits of its coordinates, the first
+    axis of `order` being the most significant. Shapes which are not a power
+    of two are traversed like the enclosing cube, skipping missing cells.
+    """
+
+    name = 'Morton'
+
+    @staticmethod
+    def flatten(startnode, integerarray, order=None):
+        return _flatten(Morton, startnode, integerarray, order)
+
+    @staticmethod
+    def indices(startnode, shape, order=None):
+        """Flat indices of the traversal rolled to begin at `startnode`."""
+        axes = _check_curve(shape, order)
+        ndim, bits = len(shape), _nbits(shape)
+        keys = np.zeros((), np.uint64)
+        for axis in range(ndim):
+            significance = np.uint64(ndim - 1 - axes.index(axis))
+            part = _dilate(np.arange(shape[axis]), ndim, bits) << significance
+            keys = np.add.outer(keys, part)
+        return _curve(keys.ravel(), startnode)
@@ -13,6 +13,7 @@ from cframe.toolbox import _check_input
 class FPD(BaseSubstractor):
 
     name = "FP difference"
+    ufunc = np.subtract  # Recovers the value: ufunc(prediction, residual)
 
     @staticmethod
     def subtract(predictionarray, integerarray):
@@ -13,6 +13,7 @@ from cframe.toolbox import _check_input
 class XOR(BaseSubstractor):
 
     name = "XOR Subtractor"
+    ufunc = np.bitwise_xor  # Recovers the value: ufunc(prediction, residual)
 
     @staticmethod
     def subtract(predictionarray, integerarray):
@@ -19,16 +19,16 @@ class FloatArray(BaseArray):
         return (np.float, np.float32, np.float64)
 
     @staticmethod
-    def from_numpy(array):
-        return Reader.from_numpy(array)
+    def from_numpy(array, dtype=np.float32):
+        return Reader.from_numpy(array, dtype)
 
     @staticmethod
-    def from_dataarray(dataarray):
-        return Reader.from_dataarray(dataarray)
+    def from_dataarray(dataarray, dtype=np.float32):
+        return Reader.from_dataarray(dataarray, dtype)
 
     @staticmethod
-    def from_dataset(dataset, var):
-        return Reader.from_dataset(dataset, var)
+    def from_dataset(dataset, var, dtype=np.float32):
+        return Reader.from_dataset(dataset, var, dtype)
 
     @staticmethod
     def from_netcdf(filename, var, *args, **kwargs):
@@ -21,7 +21,7 @@ class Sequence(BaseSequence):
         if isinstance(value, str):
             err_msg = "String not allowed."
             raise TypeError(err_msg)
-        value = np.array(value)
+        value = np.asarray(value)
         if not (isinstance(value, np.ndarray) and value.ndim == 1):
             err_msg = "Not a numpy array with one dimension."
             raise TypeError(err_msg)
@@ -69,7 +69,7 @@ class IndexSequence(Sequence):
     def _get_sequence(self):
         return self._sequence
     def _set_sequence(self, value):
-        value = np.array(value)
+        value = np.asarray(value)
         if not (isinstance(value, np.ndarray) and value.ndim == 1 and
                 value.dtype in (int, np.int32, np.int64)):
             err_msg = "Not a numpy array with one dimension and dtype=int."
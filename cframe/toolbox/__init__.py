@@ -66,3 +66,19 @@ def _check_input(obj, source):
         raise TypeError(err)
     return obj
 
+
+
+def _output(out, shape, dtype):
+    """Return the preallocated array `out` or allocate a new one."""
+    if out is None:
+        return np.empty(shape, dtype)
+    if not isinstance(out, np.ndarray):
+        out = getattr(out, 'array', out)  # ArrayInterface objects
+    if not isinstance(out, np.ndarray) or out.dtype != dtype:
+        err_msg = "Expected out as np.ndarray with {}, got {}".format(
+            np.dtype(dtype), getattr(out, 'dtype', type(out)))
+        raise TypeError(err_msg)
+    if out.shape != shape:
+        err_msg = "Expected out with shape {}, got {}".format(shape, out.shape)
+        raise ValueError(err_msg)
+    return out
@@ -0,0 +1,57 @@
+#!/usr/bin/env python
+# coding: utf-8
+"""
+Vectorized bit statistics of 32 and 64 bit integer arrays.
+
+Signed arrays are counted on their two's complement bit pattern.
+"""
+
+from cframe.toolbox import get_bits
+import numpy as np
+
+_POPCOUNT = np.array([bin(x).count('1') for x in range(256)], np.uint8)
+
+
+def _unsigned(arr):
+    """Unsigned view of the 32 or 64 bit integer array `arr`."""
+    arr = np.asarray(arr)
+    bits = get_bits(arr)
+    if arr.dtype.kind not in 'iu':
+        err = "Expected integer array, got {}".format(arr.dtype)
+        raise TypeError(err)
+    return arr.view('uint{}'.format(bits)), bits
+
+
+def bit_length(arr, dtype=np.uint8):
+    """Number of significant bits of each element, 0 for zeros.
+
+    32 bit halves convert exactly to float64, so the bit length is the
+    exponent of `np.frexp`.
+    """
+    x, bits = _unsigned(arr)
+    result = np.frexp(x & x.dtype.type(0xFFFFFFFF))[1]
+    if bits == 64:
+        high = np.frexp(x >> np.uint64(32))[1]
+        result = np.where(high > 0, high + 32, result)
+    return result.astype(dtype)
+
+
+def lzc(arr):
+    """Leading zero count of each element, the full width for zeros."""
+    _, bits = _unsigned(arr)
+    return np.uint8(bits) - bit_length(arr)
+
+
+def tzc(arr):
+    """Trailing zero count of each element, the full width for zeros."""
+    x, bits = _unsigned(arr)
+    lowest = x & (~x + x.dtype.type(1))
+    return np.where(x == 0, np.uint8(bits), bit_length(lowest) - np.uint8(1))
+
+
+def popcount(arr):
+    """Number of set bits of each element."""
+    x, bits = _unsigned(arr)
+    flat = np.ascontiguousarray(x).reshape(-1)
+    counts = _POPCOUNT[flat.view(np.uint8)].reshape(-1, bits // 8)
+    return counts.sum(axis=-1, dtype=np.uint8).reshape(x.shape)
@@ -5,7 +5,8 @@ Feeder prepares the Sequence objects to be consumed by the Predictors.
 """
 from cframe.backend.sequenceobj import BaseSequence  # Input
 from cframe.objects.arrays.predictionarray import PredictionArray
-from cframe.toolbox import get_bits, _check_input
+from cframe.objects.arrays.integerarray import IntegerArray
+from cframe.toolbox import get_bits, _check_input, _output
 import numpy as np
 
 
@@ -19,12 +20,13 @@ class BaseFeeder:
         self.kwargs = kwargs
         self.obj = 0  # Count elements predicted
 
-    def reset(self):
+    def reset(self, **kwargs):
         """Resetting the Predictor to initial state.
 
         Possibility for the Feeder entity to reset the predictor to its original initial state.
+        Keyword arguments (e.g. `bits`) are passed to the predictor on top of `self.kwargs`.
         """
-        self.predictor = self.pred(*self.args, **self.kwargs)
+        self.predictor = self.pred(*self.args, **dict(self.kwargs, **kwargs))
         self.obj = 0
 
     def step(self, value):
@@ -42,22 +44,100 @@ class BaseFeeder:
 class SeqFeeder(BaseFeeder):
     """Feeder for predictors using the Sequence objects for prediction."""
 
-    def feed(self, seqobj, pa=True):
-        """Feed Sequence object to initial predictors"""
+    def feed(self, seqobj, pa=True, out=None, seqbuf=None):
+        """Feed Sequence object to initial predictors
+
+        The predictions are made for the whole sequence (via `predict_all`
+        if the predictor offers it) and scattered to the grid with one fancy
+        index assignment. `out` is reused for the result (the grid, or the
+        sequence if not `pa`) and `seqbuf` for the predictions of the step
+        by step protocol.
+        """
         seqobj = _check_input(seqobj, BaseSequence)
-        self.kwargs['bits'] = get_bits(seqobj.data)
+        bits = get_bits(seqobj.data)
+        data = seqobj.data
 
-        self.reset()
+        self.reset(bits=bits)
+        if getattr(self.predictor, 'predict_all', None) is not None:
+            predictions = self.predictor.predict_all(data)
+            self.obj += predictions.size
+        else:
+            predictions = _output(seqbuf if pa else out, data.shape, data.dtype)
+            for i, true in enumerate(data):
+                predictions[i] = self.step(true)
         if not pa:
-            result = np.array([self.step(x) for x in seqobj.data])
+            result = predictions
+            if out is not None and predictions is not out:
+                result = _output(out, data.shape, data.dtype)
+                result[...] = predictions
         else:
-            result = np.zeros_like(seqobj.data).reshape(seqobj.shape)
-            for i in range(len(seqobj.sequence)):
-                idx = seqobj[i]
-                true = seqobj.data[i]
-                prediction = self.step(true)
-                result.flat[idx] = prediction
+            result = _output(out, seqobj.shape, data.dtype)
+            result.flat[seqobj.sequence] = predictions
             result = PredictionArray(result)
         name = str(self.predictor)
-        self.reset()
-        return name, result
\ No newline at end of file
+        self.reset(bits=bits)
+        return name, result
+
+
+class MultiFeeder:
+    """Feeder running several predictors over one Sequence object.
+
+    Predictors offering `predict_all` consume the whole sequence at once,
+    all others are stepped together in a single traversal.
+    """
+
+    def __init__(self, predictors, *args, **kwargs):
+        self.feeders = [SeqFeeder(p, *args, **kwargs) for p in predictors]
+
+    def feed(self, seqobj, pa=True):
+        """List of (name, PredictionArray) for every predictor.
+
+        Without `pa` the predictions are returned in sequence order.
+        """
+        seqobj = _check_input(seqobj, BaseSequence)
+        predictions = self._predict(seqobj)
+        result = []
+        for name, pred in predictions:
+            if pa:
+                grid = np.empty(seqobj.shape, seqobj.data.dtype)
+                grid.flat[seqobj.sequence] = pred
+                pred = PredictionArray(grid)
+            result.append((name, pred))
+        return result
+
+    def report(self, seqobj, subtractors):
+        """Residual statistics (`QA.residue_report`) per predictor and subtractor.
+
+        Residuals are only formed in sequence order, the statistics do not
+        depend on the position of the values in the grid.
+        """
+        from cframe.toolbox.qualityassessment import QA
+        seqobj = _check_input(seqobj, BaseSequence)
+        values = IntegerArray(seqobj.data)
+        result = []
+        for name, pred in self._predict(seqobj):
+            reports = {sub.name: QA.residue_report(
+                sub.subtract(PredictionArray(pred), values)) for sub in subtractors}
+            result.append((name, reports))
+        return result
+
+    def _predict(self, seqobj):
+        """Names and prediction sequences of all predictors."""
+        data = seqobj.data
+        bits = get_bits(data)
+        predictions, stepped = [], []
+        for feeder in self.feeders:
+            feeder.reset(bits=bits)
+            if getattr(feeder.predictor, 'predict_all', None) is not None:
+                predictions.append(feeder.predictor.predict_all(data))
+            else:
+                predictions.append(np.empty_like(data))
+                stepped.append((feeder.predictor, predictions[-1]))
+        for i, true in enumerate(data):
+            for predictor, pred in stepped:
+                pred[i] = predictor.predict()
+                predictor.update(true)
+        names = [str(feeder.predictor) for feeder in self.feeders]
+        for feeder in self.feeders:
+            feeder.reset(bits=bits)
+        return list(zip(names, predictions))
@@ -4,15 +4,28 @@
 Parallel execution of benchmarks.
 """
 
+import os
+import tempfile
 import numpy as np
-from multiprocessing import cpu_count, Array
+from multiprocessing import cpu_count
+from multiprocessing.shared_memory import SharedMemory
 from concurrent import futures
-import ctypes
+from cframe.format.pascformat import Format
+from cframe.objects.arrays.floatarray import FloatArray
+from cframe.objects.coded import Coded
+from cframe.toolbox.plancache import PLANS
+
+SHM = '/dev/shm'  # tmpfs of POSIX shared memory
 
 class ParallelProcessWorkflow:
     """
-    Parallel execution of Benchmarks using Threads.
-    
+    Parallel execution of Benchmarks using Processes.
+
+    The input array is published once in shared memory, workers attach to
+    it by name. Every worker writes its Coded result as a PSC file into a
+    spill directory, the results are memory mapped from there. Hence,
+    neither input nor results are pickled.
+
     Arguments
     =========
     floatarray : Floatarray
@@ -23,56 +36,206 @@ class ParallelProcessWorkflow:
         Using a Feeder object for speed up.
     cpus : int
         Number of cores to be used.
-    
+    spill : str
+        Directory for the results, '/dev/shm' by default if it exists,
+        else the temporary directory. Spill files are removed once mapped.
+
     Returns
     =======
-    result : None
-        None
+    result : generator
+        (name, Coded) of each workflow as it completes, "Error" instead of
+        the Coded object if the workflow failed.
     """
 
-    def compress(self, workflows, floatarray, start, feeder, cpus=None):
+    def compress(self, workflows, floatarray, start, feeder, cpus=None, spill=None):
         if cpus is None:
             cpus = cpu_count()
-        # Generate shared memory object
-        mapping = {'float32':ctypes.c_float, 'float64':ctypes.c_double}
-        shared_array_base = Array(mapping.get(str(floatarray.dtype)), floatarray.size)
-        shared_array = np.ctypeslib.as_array(shared_array_base.get_obj())
-        shared_array[:] = floatarray.flat[:]
-        shared_array = shared_array.reshape(floatarray.shape)
-
-        with futures.ProcessPoolExecutor(max_workers=cpus) as executor:
-            jobs = {executor.submit(x.compress, shared_array, start, feeder): str(x) for wfID,x in enumerate(workflows)}
-            try:
-                for done in futures.as_completed(jobs):
-                    name = jobs[done]
-                    print('Compression: WF id:{} DONE!'.format(name))
-                    try:
-                        result = done.result()
-                        yield (name, result)
-                    except:
-                        yield (name, "Error")
-            except KeyboardInterrupt:
-                _ = [k.cancel() for k in jobs.keys()]
+        if isinstance(floatarray, np.ndarray):
+            floatarray = FloatArray(floatarray)
+        shm, shared_array = _publish(floatarray.array)
+        _prewarm(workflows, start, floatarray.shape)
+
+        try:
+            with tempfile.TemporaryDirectory(dir=_spill(spill)) as spilldir, \
+                    futures.ProcessPoolExecutor(max_workers=cpus) as executor:
+                jobs = {executor.submit(_compress_shared, x, shm.name, shared_array.shape,
+                                        shared_array.dtype, start, feeder, spilldir): str(x)
+                        for wfID,x in enumerate(workflows)}
+                try:
+                    for done in futures.as_completed(jobs):
+                        name = jobs[done]
+                        print('Compression: WF id:{} DONE!'.format(name))
+                        try:
+                            result = _unspill(done.result())
+                            yield (name, result)
+                        except:
+                            yield (name, "Error")
+                except KeyboardInterrupt:
+                    _ = [k.cancel() for k in jobs.keys()]
+        finally:
+            del shared_array
+            _release(shm)
 
+    def decompress(self, workflows, results, cpus=None, spill=None, maxpending=None):
+        """
+        Decompression of the `compress` results on a process pool.
 
-    def decompress(self, workflows, results, cpus=None):
+        For every result the parent allocates an output file in the spill
+        directory, the worker maps it and writes its FloatArray into it.
+        The parent maps the file in turn and removes it, so the yielded
+        arrays share the pages with the worker and live as long as they
+        are referenced. At most `maxpending` outputs are allocated at once,
+        `results` is consumed lazily.
+
+        Arguments
+        =========
+        workflows : list of Workflow
+            Workflows of the results.
+        results : iterable of (key, Coded)
+            The key is the index of the workflow in `workflows`, the
+            workflow itself or its name as yielded by `compress`. Failed
+            results ("Error") are skipped.
+        cpus : int
+            Number of cores to be used.
+        spill : str
+            Directory for the outputs, '/dev/shm' by default if it exists,
+            else the temporary directory.
+        maxpending : int
+            Bound of outputs allocated at once, twice `cpus` by default.
+
+        Returns
+        =======
+        result : generator
+            (key, FloatArray) of each result as it completes.
+        """
         if cpus is None:
             cpus = cpu_count()
-        with futures.ThreadPoolExecutor(max_workers=cpus) as executor:
-            jobs = {executor.submit(workflows[res[0]].decompress, res[1]):res[0] for res in results}
+        if maxpending is None:
+            maxpending = 2 * cpus
+        workflows = list(workflows)
+        names = {str(x): x for x in workflows}
+        with tempfile.TemporaryDirectory(dir=_spill(spill)) as spilldir, \
+                futures.ProcessPoolExecutor(max_workers=cpus) as executor:
+            jobs = {}
             try:
-                for done in futures.as_completed(jobs):
-                    name = jobs[done]
-                    print('Decompression: WF id:{} DONE!'.format(name))
-                    try:
-                        result = done.result()
-                        yield result
-                    except:
-                        raise
+                for key, coded in results:
+                    if isinstance(coded, str):
+                        continue
+                    if len(jobs) >= maxpending:
+                        done, _ = futures.wait(jobs, return_when=futures.FIRST_COMPLETED)
+                        for job in done:
+                            yield _collect(job, jobs.pop(job))
+                    wf = _workflow(key, workflows, names)
+                    shape = tuple(int(x) for x in coded.shape)
+                    dtype = np.dtype('float{}'.format(coded.bits))
+                    path = _allocate(spilldir, int(np.prod(shape)) * dtype.itemsize)
+                    job = executor.submit(_decompress_mapped, wf, _detach(coded), path, shape, dtype)
+                    jobs[job] = key, path, shape, dtype
+                for job in futures.as_completed(jobs):
+                    yield _collect(job, jobs[job])
             except KeyboardInterrupt:
                 _ = [k.cancel() for k in jobs.keys()]
 
 
+def _prewarm(workflows, start, shape):
+    """Build the sequence plans before forking, workers inherit them."""
+    for wf in workflows:
+        try:
+            PLANS.indices(wf.sequencer, start, shape)
+        except (TypeError, ValueError):
+            pass  # Reported by the failing workflow itself
+
+
+def _publish(array):
+    """Copy `array` once into new shared memory, returns it and its view."""
+    shm = SharedMemory(create=True, size=max(array.nbytes, 1))
+    shared = np.ndarray(array.shape, array.dtype, buffer=shm.buf)
+    shared[...] = array
+    return shm, shared
+
+
+def _spill(spill):
+    """Spill directory, shared memory unless `spill` is given."""
+    if spill is None and os.path.isdir(SHM) and os.access(SHM, os.W_OK):
+        return SHM
+    return spill
+
+
+def _compress_shared(workflow, name, shape, dtype, start, feeder, spilldir):
+    """Compress the shared array `name`, returns the path of the spilled result."""
+    shm = SharedMemory(name=name)
+    try:
+        data = np.ndarray(shape, dtype, buffer=shm.buf)
+        coded = workflow.compress(FloatArray(data), start, feeder)
+        del data
+    finally:
+        shm.close()
+    fd, path = tempfile.mkstemp(suffix='.psc', dir=spilldir)
+    with os.fdopen(fd, 'wb') as f:
+        Format.write(coded, f)
+    return path
+
+
+def _decompress_mapped(workflow, coded, path, shape, dtype):
+    """Decompress `coded` into the preallocated output file `path`."""
+    out = np.memmap(path, dtype, 'r+', shape=shape)
+    out[...] = workflow.decompress(coded).array.reshape(shape)
+    out.flush()
+    del out
+
+
+def _allocate(spilldir, nbytes):
+    """Path of a new output file with `nbytes`."""
+    fd, path = tempfile.mkstemp(suffix='.raw', dir=spilldir)
+    try:
+        os.ftruncate(fd, max(nbytes, 1))  # Empty files can not be mapped
+    finally:
+        os.close(fd)
+    return path
+
+
+def _collect(job, output):
+    """(key, FloatArray) of a finished job, mapped from its output file."""
+    key, path, shape, dtype = output
+    print('Decompression: WF id:{} DONE!'.format(key))
+    try:
+        job.result()
+        result = np.memmap(path, dtype, 'r+', shape=shape)
+    finally:
+        os.remove(path)
+    return key, FloatArray(result.view(np.ndarray))
+
+
+def _workflow(key, workflows, names):
+    """Workflow of a result key: index, workflow or name."""
+    if isinstance(key, (int, np.integer)):
+        return workflows[key]
+    if isinstance(key, str):
+        return names[key]
+    return key
+
+
+def _release(shm):
+    shm.close()
+    shm.unlink()
+
+
+def _detach(coded):
+    """Coded object owning its data, views into files can not be pickled."""
+    if isinstance(coded.blzc, bytes) and isinstance(coded.bnoise, bytes):
+        return coded
+    return Coded(coded.lpad, coded.npad, bytes(coded.blzc), bytes(coded.bnoise),
+                 coded.start, coded.bits, coded.shape, coded.version)
+
+
+def _unspill(path):
+    """Coded object of a spill file, mapped and then removed from disk."""
+    try:
+        return Format.read(path)
+    finally:
+        os.remove(path)
+
+
 if __name__ == '__main__':
     # Mapper
     from cframe.modifier.mapper.ordered import Ordered
@@ -135,12 +298,12 @@ if __name__ == '__main__':
 
 
     par = ParallelProcessWorkflow()
-    compressions = par.compress(workflows, a, 0, SeqFeeder)
+    compressions = dict(par.compress(workflows, a, 0, SeqFeeder))
     import operator
-    res = {x[0]:x[1].nbytes/original for x in compressions if not isinstance(x[1], str)}
+    res = {k:v.nbytes/original for k, v in compressions.items() if not isinstance(v, str)}
     sorted_x = sorted(res.items(), key=operator.itemgetter(1))
     print("#"*25)
     for i,v in sorted_x:
         print('{:50s} \t {:.5f}'.format(i,v))
-    # decompressions = par.decompress(workflows, compressions)
-    # print([a==x for x in decompressions])
\ No newline at end of file
+    decompressions = par.decompress(workflows, compressions.items())
+    print('All equal:', all(a == x for _, x in decompressions))
\ No newline at end of file
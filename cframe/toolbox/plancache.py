@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+# coding: utf-8
+"""
+Cache of traversal permutations (sequence plans) shared by all workflows.
+"""
+
+from collections import OrderedDict
+from threading import Lock
+import numpy as np
+
+
+class PlanCache:
+    """Memory bounded LRU cache of sequencer permutations.
+
+    Plans are keyed by (sequencer, shape, order, startnode) and stored as
+    read-only arrays, so every caller shares the same buffer without
+    copying. Processes forked after a plan was built (e.g. the pool of
+    `ParallelProcessWorkflow`) inherit it copy-on-write.
+
+    Arguments
+    =========
+    maxbytes : int
+        Upper bound for the summed size of all cached plans.
+    """
+
+    def __init__(self, maxbytes=512 * 2**20):
+        self.maxbytes = maxbytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._plans = OrderedDict()
+        self._lock = Lock()
+
+    def __len__(self):
+        return len(self._plans)
+
+    def __repr__(self):
+        return "PlanCache({} plans, {}/{} bytes, {} hits, {} misses)".format(
+            len(self), self.nbytes, self.maxbytes, self.hits, self.misses)
+
+    def indices(self, sequencer, startnode, shape, order=None):
+        """Flat traversal indices of `sequencer` (see `sequencer.indices`)."""
+        key = _key('indices', sequencer, startnode, shape, order)
+        plan = self._get(key)
+        if plan is None:
+            plan = self._put(key, sequencer.indices(startnode, shape, order))
+        return plan
+
+    def inverse(self, sequencer, startnode, shape, order=None):
+        """Inverse permutation, i.e. the position of each cell in the traversal."""
+        key = _key('inverse', sequencer, startnode, shape, order)
+        plan = self._get(key)
+        if plan is None:
+            seq = self.indices(sequencer, startnode, shape, order)
+            inv = np.empty_like(seq)
+            inv[seq] = np.arange(seq.size, dtype=seq.dtype)
+            plan = self._put(key, inv)
+        return plan
+
+    def clear(self):
+        with self._lock:
+            self._plans.clear()
+            self.nbytes = 0
+
+    def _get(self, key):
+        with self._lock:
+            plan = self._plans.get(key)
+            if plan is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._plans.move_to_end(key)
+            return plan
+
+    def _put(self, key, plan):
+        plan.setflags(write=False)
+        if plan.nbytes > self.maxbytes:
+            return plan  # Never fits, hand it out uncached
+        with self._lock:
+            if key not in self._plans:
+                self._plans[key] = plan
+                self.nbytes += plan.nbytes
+            while self.nbytes > self.maxbytes:
+                _, old = self._plans.popitem(last=False)
+                self.nbytes -= old.nbytes
+            return self._plans.get(key, plan)
+
+
+def _key(kind, sequencer, startnode, shape, order):
+    if order is not None and not isinstance(order, str):
+        order = tuple(int(x) for x in order)
+    shape = tuple(int(x) for x in shape)
+    return kind, sequencer, shape, order, int(startnode)
+
+
+PLANS = PlanCache()
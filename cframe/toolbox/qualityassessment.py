@@ -5,32 +5,12 @@ Quality assessment of the residue array given as input.
 """
 
 from cframe.toolbox import get_bits
+from cframe.toolbox.bitops import lzc, tzc
 import tempfile
 import numpy as np
 import subprocess as sp
 import os
 
-def _trailing_zero_count(val, bits=32):
-    """Count trailing zeroes."""
-    cnt = 0
-    for i in range(0, bits):
-        if val & (1 << i) != 0:
-            break
-        cnt += 1
-    return cnt
-_vtzc = np.frompyfunc(_trailing_zero_count, 2, 1)
-
-
-def _leading_zero_count(val, bits=32):
-    """Count leading zeroes."""
-    cnt = 0
-    for i in range(0, bits):
-        if val & (1 << (bits - 1 - i)) != 0:
-            break
-        cnt += 1
-    return cnt
-_vlzc = np.frompyfunc(_leading_zero_count, 2, 1)
-
 def xz_compression(arr):
     # TODO Might be added to a separate module in the toolbox
     with tempfile.NamedTemporaryFile('wb') as f:
@@ -47,17 +27,17 @@ class QA(object):
     @staticmethod
     def residue_report(residuearray):
         bits = get_bits(residuearray.array)
-        lzc = _vlzc(residuearray.array, bits)
-        tzc = _vtzc(residuearray.array, bits)
+        lzcs = lzc(residuearray.array).sum(dtype=np.int64)
+        tzcs = tzc(residuearray.array).sum(dtype=np.int64)
         nbits = residuearray.size * bits
 
         information = {
             "Bits": bits,
             "Filesize [bits]": nbits,
-            "Total LZC+1" : lzc.sum() + residuearray.size,
-            "Total TZC+1" : tzc.sum() + residuearray.size,
-            "LZC+1 %": (lzc.sum() + residuearray.size) / nbits,
-            "TZC+1 %": (tzc.sum() + residuearray.size) / nbits,
+            "Total LZC+1" : lzcs + residuearray.size,
+            "Total TZC+1" : tzcs + residuearray.size,
+            "LZC+1 %": (lzcs + residuearray.size) / nbits,
+            "TZC+1 %": (tzcs + residuearray.size) / nbits,
         }
 
         return information
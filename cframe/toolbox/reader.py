@@ -14,44 +14,51 @@ from cframe.objects.arrays import floatarray as fa
 import lzma
 
 class Reader:
+    """Reader of FloatArrays.
+
+    The data is converted to `dtype` (default: np.float32). Passing
+    `dtype=None` keeps the precision of the source.
+    """
 
     name = "Reader"
 
     @staticmethod
-    def from_dataarray(dataarray):
+    def from_dataarray(dataarray, dtype=np.float32):
         dataarray = _raiseTypeError(dataarray, xr.DataArray)
-        dataarray = dataarray.astype(np.float32)  # TODO: Forced to do only 32 bits
+        if dtype is not None:
+            dataarray = dataarray.astype(dtype)
         result = fa.FloatArray(dataarray.values)
         return result
 
     @staticmethod
-    def from_dataset(dataset, var):
+    def from_dataset(dataset, var, dtype=np.float32):
         dataset = _raiseTypeError(dataset, xr.Dataset)
         if not hasattr(dataset, var):
             avail = list(dataset.data_vars)
             err = "{} not in Dataset, only {}".format(var, avail)
             raise KeyError(err)
         dataarray = getattr(dataset, var)
-        return Reader.from_dataarray(dataarray=dataarray)
+        return Reader.from_dataarray(dataarray=dataarray, dtype=dtype)
 
     @staticmethod
-    def from_numpy(array):
+    def from_numpy(array, dtype=np.float32):
         array = _raiseTypeError(array, np.ndarray)
         if array.dtype not in (float, np.float32, np.float64):
             err = "Expected float dtype, got {}".format(array.dtype)
             raise TypeError(err)
-        array = array.astype(np.float32)  # TODO: Forced to do only 32 bits
+        if dtype is not None:
+            array = array.astype(dtype)
         return fa.FloatArray(array)
 
     @staticmethod
-    def from_netcdf(filename, var, *args, **kwargs):
+    def from_netcdf(filename, var, *args, dtype=np.float32, **kwargs):
         if not os.path.isfile(filename):
             err = "{} is not a file.".format(filename)
             raise FileNotFoundError(err)
         ds = xr.open_dataset(filename, *args, **kwargs)
-        return Reader.from_dataset(dataset=ds, var=var)
+        return Reader.from_dataset(dataset=ds, var=var, dtype=dtype)
 
     @staticmethod
-    def from_data(key, var, *args, **kwargs):
+    def from_data(key, var, *args, dtype=np.float32, **kwargs):
         path = get_data_path(key)
-        return Reader.from_netcdf(path, var,  *args, **kwargs)
\ No newline at end of file
+        return Reader.from_netcdf(path, var,  *args, dtype=dtype, **kwargs)
\ No newline at end of file
@@ -3,6 +3,7 @@
 """Floating Point Unit/Uint representation."""
 
 
+from cframe.toolbox import bitops
 import numpy as np
 from bitstring import BitArray as ba
 
@@ -76,22 +77,12 @@ class FPMapping:
     @property
     def lzc(self):
         """Count leading zeroes."""
-        cnt = 0
-        for i in range(0, self.bits):
-            if self.U & (1 << (self.bits - 1 - i)) != 0:
-                break
-            cnt += 1
-        return cnt
+        return int(bitops.lzc(np.array(self.U, 'uint{}'.format(self.bits))))
 
     @property
     def tzc(self):
         """Count trailing zeroes."""
-        cnt = 0
-        for i in range(0, self.bits):
-            if self.U & (1 << i) != 0:
-                break
-            cnt += 1
-        return cnt
+        return int(bitops.tzc(np.array(self.U, 'uint{}'.format(self.bits))))
 
 
 class FPUL(FPMapping):
@@ -0,0 +1,182 @@
+#!/usr/bin/env python
+# coding: utf-8
+"""
+Compression of arrays in independent N-D blocks (tiles).
+"""
+
+from concurrent import futures
+from itertools import product
+from multiprocessing import cpu_count
+from cframe.format.pascformat import Format
+from cframe.format.pscfile import PSCFile
+from cframe.objects.arrays.floatarray import FloatArray
+from cframe.toolbox.parallel import _detach, _prewarm
+import numpy as np
+
+
+class TiledWorkflow:
+    """
+    Compression of a FloatArray in independent blocks on a process pool.
+
+    Every block is compressed with its own predictor state into its own
+    Coded stream, so blocks compress and decompress concurrently. The
+    streams of one array are stored as a PSC2 container: the header holds
+    the shape of the array, the index the shape of every block. The tile
+    shape is the shape of the first block.
+
+    Arguments
+    =========
+    workflow : Workflow
+        Workflow for every block.
+    tiles : tuple of int
+        Shape of the blocks, missing trailing dimensions are not split.
+    cpus : int
+        Number of processes, all cores by default. With one cpu the
+        blocks are processed in this process.
+    """
+
+    def __init__(self, workflow, tiles, cpus=None):
+        if not all(isinstance(x, (int, np.integer)) and x > 0 for x in tiles):
+            err = "Expected positive integer tile shape, got {}".format(tiles)
+            raise ValueError(err)
+        self.workflow = workflow
+        self.tiles = tuple(int(x) for x in tiles)
+        self.cpus = cpu_count() if cpus is None else cpus
+
+    def __repr__(self):
+        return "Tiled({}, {})".format(self.workflow, self.tiles)
+
+    def blocks(self, shape):
+        """Slices of all blocks of an array with `shape`, in C order."""
+        return _blocks(shape, self.tiles)
+
+    def compress(self, floatarray, start=0, feeder=None, *args, **kwargs):
+        """List of Coded streams, one per block.
+
+        The start node is clamped to the last node of blocks with fewer
+        nodes, each stream records the start node it used.
+        """
+        if isinstance(floatarray, np.ndarray):
+            floatarray = FloatArray(floatarray)
+        data = floatarray.array
+        blocks = [data[x] for x in self.blocks(data.shape)]
+        starts = [min(start, max(x.size - 1, 0)) for x in blocks]  # Edge blocks may be smaller
+        for shape, first in {(x.shape, y) for x, y in zip(blocks, starts)}:
+            _prewarm([self.workflow], first, shape)
+        jobs = [(self.workflow, x, y, feeder, args, kwargs) for x, y in zip(blocks, starts)]
+        return self._map(_compress_block, jobs)
+
+    def decompress(self, coded, shape):
+        """FloatArray of `shape` from the Coded streams of its blocks."""
+        blocks = self.blocks(shape)
+        if len(blocks) != len(coded):
+            err = "Expected {} blocks, got {}".format(len(blocks), len(coded))
+            raise ValueError(err)
+        jobs = [(self.workflow, _detach(x)) for x in coded]
+        result = np.empty(shape, 'float{}'.format(coded[0].bits))
+        for block, arr in zip(blocks, self._map(_decompress_block, jobs)):
+            result[block] = arr.reshape(result[block].shape)
+        return FloatArray(result)
+
+    def write(self, floatarray, fileobj, start=0, feeder=None, *args, **kwargs):
+        """Compress `floatarray` into a PSC2 container, returns bytes written."""
+        if isinstance(floatarray, np.ndarray):
+            floatarray = FloatArray(floatarray)
+        coded = self.compress(floatarray, start, feeder, *args, **kwargs)
+        return Format.write(coded, fileobj, version=2, shape=floatarray.array.shape)
+
+    def read(self, file):
+        """FloatArray of a PSC2 container written by `write`."""
+        with PSCFile(file) as psc:
+            tiled = TiledWorkflow(self.workflow, psc.index[0]['shape'], self.cpus)
+            return tiled.decompress([psc.coded(k) for k in range(len(psc))], psc.shape)
+
+    def decompress_region(self, file, slices):
+        """
+        FloatArray of the hyperslab `slices` of a PSC2 container.
+
+        Only the blocks intersecting the bounding box of the region are
+        decoded (in parallel), so the cost scales with the region and not
+        with the file.
+
+        Arguments
+        =========
+        file : str, path, file object or PSCFile
+            Container written by `write`.
+        slices : tuple of slice and int
+            Region like in numpy basic indexing, integers drop the dimension.
+
+        Returns
+        =======
+        result : FloatArray
+            The requested sub-array.
+        """
+        if not isinstance(file, PSCFile):
+            with PSCFile(file) as psc:
+                return self.decompress_region(psc, slices)
+        shape = file.shape
+        tiles = tuple(int(x) for x in file.index[0]['shape'])
+        ranges, keep = _ranges(shape, slices)
+        lo = [min(r[0], r[-1]) if len(r) else 0 for r in ranges]
+        hi = [max(r[0], r[-1]) + 1 if len(r) else 0 for r in ranges]
+
+        grid = [-(-n // t) for n, t in zip(shape, tiles)]
+        ids = list(product(*[range(a // t, -(-b // t)) for a, b, t in zip(lo, hi, tiles)]))
+        flat = [int(np.ravel_multi_index(x, grid)) for x in ids]
+        jobs = [(self.workflow, _detach(file.coded(k))) for k in flat]
+        bits = int(file.index[0]['bits'])
+        box = np.empty([b - a for a, b in zip(lo, hi)], 'float{}'.format(bits))
+        for block, arr in zip(ids, self._map(_decompress_block, jobs)):
+            first = [x * t for x, t in zip(block, tiles)]
+            arr = arr.reshape([min(a + t, n) - a for a, t, n in zip(first, tiles, shape)])
+            parts = [(max(a, l), min(a + t, h)) for a, t, l, h in zip(first, tiles, lo, hi)]
+            box[tuple(slice(a - l, b - l) for (a, b), l in zip(parts, lo))] = \
+                arr[tuple(slice(a - f, b - f) for (a, b), f in zip(parts, first))]
+
+        result = box[np.ix_(*[np.asarray(r, int) - l for r, l in zip(ranges, lo)])]
+        return FloatArray(result.reshape([len(r) for r, k in zip(ranges, keep) if k]))
+
+    def _map(self, func, jobs):
+        if self.cpus <= 1 or len(jobs) <= 1:
+            return [func(*x) for x in jobs]
+        chunksize = max(1, len(jobs) // (4 * self.cpus))
+        with futures.ProcessPoolExecutor(max_workers=self.cpus) as executor:
+            return list(executor.map(func, *zip(*jobs), chunksize=chunksize))
+
+
+def _blocks(shape, tiles):
+    """Slices of the blocks of `tiles` covering `shape`, in C order."""
+    if len(tiles) > len(shape):
+        err = "Expected at most {} tile dimensions, got {}".format(len(shape), tiles)
+        raise ValueError(err)
+    tiles = tuple(tiles) + tuple(shape[len(tiles):])
+    ranges = [[slice(lo, min(lo + t, n)) for lo in range(0, n, t)] if n else [slice(0, 0)]
+              for n, t in zip(shape, tiles)]
+    return list(product(*ranges))
+
+
+def _ranges(shape, slices):
+    """Indices selected by `slices` per dimension and whether it is kept."""
+    slices = slices if isinstance(slices, tuple) else (slices,)
+    if len(slices) > len(shape):
+        err = "Expected at most {} indices, got {}".format(len(shape), slices)
+        raise IndexError(err)
+    ranges, keep = [], []
+    for n, x in zip(shape, slices + (slice(None),) * (len(shape) - len(slices))):
+        if isinstance(x, slice):
+            ranges.append(range(*x.indices(n)))
+            keep.append(True)
+        else:
+            x = range(n)[int(x)]
+            ranges.append(range(x, x + 1))
+            keep.append(False)
+    return ranges, keep
+
+
+def _compress_block(workflow, data, start, feeder, args, kwargs):
+    return workflow.compress(FloatArray(np.ascontiguousarray(data)), start, feeder, *args, **kwargs)
+
+
+def _decompress_block(workflow, coded):
+    # FloatArrays can not be unpickled, workers return the plain array
+    return workflow.decompress(coded).array
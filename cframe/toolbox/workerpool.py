@@ -0,0 +1,143 @@
+#!/usr/bin/env python
+# coding: utf-8
+"""
+Long-lived process pool for streams of compression jobs.
+"""
+
+import tempfile
+from importlib import import_module
+from multiprocessing import cpu_count, get_context
+from threading import BoundedSemaphore
+from concurrent import futures
+from cframe.objects.arrays.floatarray import FloatArray
+from cframe.toolbox.parallel import _compress_shared, _prewarm, _publish, _release, _spill, _unspill
+import numpy as np
+
+PRELOAD = (
+    'numpy',
+    'pandas',
+    'xarray',
+    'bitstring',
+    'cframe.toolbox.workflow',
+    'cframe.toolbox.feeder',
+    'cframe.format.pascformat',
+)
+
+
+class WorkerPool:
+    """
+    Persistent pool of worker processes for repeated compression jobs.
+
+    The workers import `preload` once at start and live as long as the
+    pool, so their sequence plans (`PLANS`) stay warm between jobs. Plans
+    are also built in this process before submitting, workers started
+    later inherit them when forked. Arrays are handed over in shared
+    memory and results come back through spill files (see
+    `ParallelProcessWorkflow`). At most `maxpending` jobs are in flight,
+    further submits block until one of them completes.
+
+    Arguments
+    =========
+    cpus : int
+        Number of worker processes, all cores by default.
+    maxpending : int
+        Bound of submitted but unfinished jobs, twice `cpus` by default.
+    preload : tuple of str
+        Modules imported by every worker on start.
+    spill : str
+        Directory for the results, '/dev/shm' by default if it exists,
+        else the temporary directory.
+    context : str
+        Multiprocessing start method, e.g. 'forkserver' for pools created
+        by threaded services.
+    """
+
+    def __init__(self, cpus=None, maxpending=None, preload=PRELOAD, spill=None, context=None):
+        self.cpus = cpu_count() if cpus is None else cpus
+        self.maxpending = 2 * self.cpus if maxpending is None else maxpending
+        self._slots = BoundedSemaphore(self.maxpending)
+        self._spilldir = tempfile.TemporaryDirectory(dir=_spill(spill))
+        self._executor = futures.ProcessPoolExecutor(
+            max_workers=self.cpus, initializer=_preload, initargs=(tuple(preload),),
+            mp_context=None if context is None else get_context(context))
+
+    def __repr__(self):
+        return "WorkerPool({} cpus, {} pending)".format(self.cpus, self.maxpending)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def submit(self, workflow, floatarray, start=0, feeder=None):
+        """Future of the Coded result, blocks while `maxpending` jobs are open."""
+        array = floatarray.array if isinstance(floatarray, FloatArray) else np.asarray(floatarray)
+        self._slots.acquire()
+        shm = None
+        try:
+            _prewarm([workflow], start, array.shape)
+            shm, shared = _publish(array)
+            del shared
+            job = self._executor.submit(_compress_shared, workflow, shm.name, array.shape,
+                                        array.dtype, start, feeder, self._spilldir.name)
+        except BaseException:
+            if shm is not None:
+                _release(shm)
+            self._slots.release()
+            raise
+        result = futures.Future()
+
+        def finish(done):
+            _release(shm)
+            self._slots.release()
+            try:
+                result.set_result(_unspill(done.result()))
+            except BaseException as err:
+                result.set_exception(err)
+
+        job.add_done_callback(finish)
+        return result
+
+    def imap(self, jobs):
+        """
+        Results of a stream of jobs as they complete.
+
+        Arguments
+        =========
+        jobs : iterable of tuple
+            Arguments of `submit`, i.e. (workflow, array[, start[, feeder]]).
+            The iterable is consumed lazily, at most `maxpending` jobs ahead.
+
+        Returns
+        =======
+        result : generator
+            (job, Coded) per job, the exception instead of the Coded object
+            if the job failed.
+        """
+        pending = {}
+        for job in jobs:
+            if len(pending) >= self.maxpending:
+                done, _ = futures.wait(pending, return_when=futures.FIRST_COMPLETED)
+                for future in done:
+                    yield pending.pop(future), _outcome(future)
+            pending[self.submit(*job)] = job
+        for future in futures.as_completed(pending):
+            yield pending[future], _outcome(future)
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        self._spilldir.cleanup()
+
+
+def _preload(modules):
+    for name in modules:
+        try:
+            import_module(name)
+        except ImportError:
+            pass  # Optional module, imported on demand if ever needed
+
+
+def _outcome(future):
+    err = future.exception()
+    return future.result() if err is None else err
@@ -5,10 +5,15 @@ An envelope class for different modifiers.
 """
 import os
 from time import time
+from functools import lru_cache
 # from cframe.toolbox.qualityassessment import QA, xz_compression
 from cframe.objects.arrays.predictionarray import PredictionArray
 from cframe.objects.arrays.integerarray import IntegerArray
+from cframe.objects.arrays.residualarray import ResidualArray
+from cframe.backend.predictormod import NDPredictor
 from cframe.objects.arrays import floatarray as fa
+from cframe.toolbox.plancache import PLANS
+from cframe.toolbox import get_bits
 import numpy as np
 
 from functools import namedtuple as nt
@@ -35,6 +40,11 @@ class Workflow(object):
             # necessary for parallel execution
             floatarray = fa.FloatArray(floatarray)
         iarr = self.mapper.map(floatarray)
+        if _grid(self.predictor):
+            # Grid predictors see the whole array, no sequence needed
+            parr = self.predictor(*args, **kwargs).predict(iarr)
+            rarr = self.subtractor.subtract(parr, iarr)
+            return self.encoder.encode(rarr, seqstart, floatarray.shape)
         seq = self.sequencer.flatten(seqstart, iarr)
 
         # The feeder improves runtime speed via pre-allocation of memory
@@ -42,14 +52,18 @@ class Workflow(object):
             feed = feeder(self.predictor, *args, **kwargs)
             _, parr = feed.feed(seq)
         else:
-            predictions = []
-            predictor = self.predictor(*args, **kwargs)
-            for value in seq.data:
-                prediction = predictor.predict()
-                predictions.append(prediction)
-                predictor.update(value)
-            prediction_ndarray = np.array(predictions).reshape(seq.shape)
-            parr = PredictionArray(prediction_ndarray)
+            predictor = self.predictor(*args, **dict(kwargs, bits=get_bits(seq.data)))
+            if getattr(predictor, 'predict_all', None) is not None:
+                predictions = predictor.predict_all(seq.data)
+            else:
+                predictions = []
+                for value in seq.data:
+                    prediction = predictor.predict()
+                    predictions.append(prediction)
+                    predictor.update(value)
+            prediction_ndarray = np.empty(seq.data.size, seq.data.dtype)
+            prediction_ndarray[seq.sequence] = predictions
+            parr = PredictionArray(prediction_ndarray.reshape(seq.shape))
         rarr = self.subtractor.subtract(parr, iarr)
         coded = self.encoder.encode(rarr, seqstart, floatarray.shape)
         return coded
@@ -61,9 +75,18 @@ class Workflow(object):
 
     def decompress(self, coded):
         residuals = self.encoder.decode(coded)
-        rarr = linear_sequencer_rev(residuals, coded.start)
-        tmp = recon_iarr(rarr, self.predictor, coded.start, self.subtractor)
-        iarr = IntegerArray(linear_iarr_rev(tmp.reshape(coded.shape), coded.start))
+        shape = tuple(int(x) for x in coded.shape)
+        itype = _integer_dtype(self.mapper, coded.bits)
+        if _grid(self.predictor):
+            rarr = np.asarray(residuals.array).astype(itype, copy=False).reshape(shape)
+            iarr = self.predictor().reconstruct(ResidualArray(rarr), self.subtractor)
+            return self.mapper.revmap(iarr)
+        seq = PLANS.indices(self.sequencer, coded.start, shape)
+        rarr = np.asarray(residuals.array).ravel()[seq].astype(itype, copy=False)
+        tmp = recon_iarr(rarr, self.predictor, coded.start, self.subtractor,
+                         bits=coded.bits)
+        inv = PLANS.inverse(self.sequencer, coded.start, shape)
+        iarr = IntegerArray(np.asarray(tmp, rarr.dtype)[inv].reshape(shape))
         farr = self.mapper.revmap(iarr)
         return farr
 
@@ -72,26 +95,36 @@ class Workflow(object):
         # return result
 
 
-def linear_sequencer_rev(rarr, startnode):
-    return np.roll(rarr, -startnode)
+def _grid(predictor):
+    """Whether `predictor` (a class or a partial of one) is an NDPredictor."""
+    return issubclass(getattr(predictor, 'func', predictor), NDPredictor)
 
 
-def linear_iarr_rev(iarr, startnode):
-    return np.roll(iarr, startnode)
+@lru_cache(maxsize=None)
+def _integer_dtype(mapper, bits):
+    """Integer dtype `mapper` produces for floats with `bits`."""
+    probe = fa.FloatArray(np.empty(0, 'float{}'.format(bits)))
+    return mapper.map(probe).array.dtype
 
 
 def reverse(residuals, predictor, subtractor, *args, **kwargs):
     # TODO Optimize using np.array and intervene with Feeder
     p = predictor(*args, **kwargs)
     for k in residuals.ravel():
-        val = p.predict()
+        # Cast like the prediction array of the compression
+        val = np.asarray(p.predict()).astype(residuals.dtype)[()]
         truth = subtractor._single(val, k)
         p.update(truth)
         yield truth
 
 
 def recon_iarr(residuals, predictor, startnode, subtractor, *args, **kwargs):
-    reconstructed = reverse(residuals, predictor, subtractor)
+    p = predictor(*args, **kwargs)
+    if getattr(p, 'reconstruct_all', None) is not None:
+        result = p.reconstruct_all(residuals.ravel(), subtractor)
+        if result is not NotImplemented:
+            return result
+    reconstructed = reverse(residuals, predictor, subtractor, *args, **kwargs)
     result = np.array([x for x in reconstructed])
     return result
 
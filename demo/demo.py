@@ -10,6 +10,7 @@ Usage:
   demo.py subsetting FILE N
   demo.py shannon FILE
   demo.py ensemble FILE
+  demo.py sweep FILE
   demo.py parallel [FILE...] [--climate] [--subset=<size>]
   demo.py compress WFNR FILE [--subset=<size>]
   demo.py -h | --help
@@ -153,6 +154,18 @@ if __name__ == '__main__':
             print("#"*25)
             for i,v in sorted_x:
                 print('{:50s} \t {:.5f}'.format(i,v))
+    elif arguments['sweep']:
+        from functools import partial
+        from cframe.toolbox.feeder import MultiFeeder
+
+        # One map and one sequence pass per mapper for all predictors
+        predictors = [LastValue, Akumuli, TwoStride, partial(StrideConfidence, threshold=7)]
+        for m in [Ordered, Raw]:
+            seq = Linear.flatten(0, m.map(FloatArray(data)))
+            for name, reports in MultiFeeder(predictors).report(seq, [XOR, FPD]):
+                for sub, report in reports.items():
+                    print('{:10s} {:30s} {:15s} {:.5f}'.format(
+                        m.name, name, sub, report['LZC+1 %']))
     elif arguments['ensemble']:
         from cframe.modifier.predictor.ensemble import LastBest, MostRight
 
@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+# coding: utf-8
+"""
+Tests for encoders.
+"""
+
+from cframe.objects.arrays.residualarray import ResidualArray
+from cframe.modifier.encoder.raw import RawEncoder
+from cframe.modifier.encoder.f1 import F1, Look
+from cframe.modifier.encoder.huffman import HuffmanEncoder, _code_lengths
+from cframe.format.pascformat import Format
+import numpy as np
+import pytest
+
+
+def _residuals(dtype, size=3000):
+    bits = 8 * np.dtype(dtype).itemsize
+    lengths = np.random.randint(1, bits + 1, size)
+    values = np.random.randint(0, 2**62, size).astype(np.uint64) >> (64 - lengths).astype(np.uint64)
+    return (values | (np.uint64(1) << (lengths - 1).astype(np.uint64))).astype(dtype)
+
+
+def _string_bytes(bits):
+    """Bytes of a string of 0 and 1, padded with zeros at the front."""
+    pad = -len(bits) % 8
+    bits = '0' * pad + bits
+    return pad, bytes(int(bits[i:i + 8], 2) for i in range(0, len(bits), 8))
+
+
+def _string_encoder(data):
+    """Reference RawEncoder on binary strings, (noise, lzc) as (pad, bytes)."""
+    binary = [np.binary_repr(x, 32) for x in data.view(np.uint32).ravel().tolist()]
+    lzc = [x.find('1') if '1' in x else 32 for x in binary]
+    noise = ''.join(x[n:] for x, n in zip(binary, lzc))
+    return _string_bytes(noise), _string_bytes(''.join(np.binary_repr(n, 5) for n in lzc))
+
+
+@pytest.mark.parametrize('dtype', [np.uint32, np.int32])
+def test_raw_encoder_equals_string_encoder(dtype):
+    rarr = ResidualArray(_residuals(dtype).reshape(30, 100))
+    coded = RawEncoder.encode(rarr, 0, rarr.array.shape)
+    noise, lzc = _string_encoder(rarr.array)
+    assert (coded.npad, coded.bnoise) == noise and (coded.lpad, coded.blzc) == lzc
+
+
+@pytest.mark.parametrize('dtype', [np.uint32, np.uint64, np.int64])
+@pytest.mark.parametrize('size', [0, 1, 7, 3000])
+def test_raw_encoder_roundtrip(dtype, size):
+    data = _residuals(dtype, size)
+    data[::5] = 0
+    rarr = ResidualArray(data)
+    coded = RawEncoder.encode(rarr, 0, data.shape)
+    result = RawEncoder.decode(coded).array
+    assert result.shape == data.shape
+    assert np.array_equal(result.view(data.dtype), data)
+
+
+@pytest.mark.parametrize('dtype', [np.uint32, np.int64])
+def test_raw_encoder_pads_survive_format(dtype):
+    data = _residuals(dtype, 3001)
+    coded = RawEncoder.encode(ResidualArray(data), 0, data.shape)
+    after = Format.from_bytes(Format.to_bytes(coded))
+    assert (after.lpad, after.npad) == (coded.lpad, coded.npad)
+    assert np.array_equal(RawEncoder.decode(after).array.view(dtype), data)
+
+
+@pytest.mark.parametrize('dtype', [np.int32, np.uint32, np.int64, np.uint64])
+def test_f1_roundtrip(dtype):
+    data = _residuals(dtype).reshape(60, 50)
+    data[::3, ::4] = 0
+    coded = F1.encode(ResidualArray(data), 0, data.shape)
+    result = F1.decode(coded).array
+    assert result.shape == data.shape
+    assert np.array_equal(result.view(data.dtype), data)
+
+
+@pytest.mark.parametrize('size', [1, 2, 3, 4, 5, 17])
+def test_f1_lookup_table_splits_lzc_fields(size):
+    lzc = np.random.randint(0, 64, size).astype(np.uint8)
+    bits = ''.join(np.binary_repr(x, 6) for x in lzc)
+    pad = -len(bits) % 8
+    bits = '0' * pad + bits
+    lvalues = np.array([int(bits[i:i + 8], 2) for i in range(0, len(bits), 8)], np.uint8)
+    assert np.array_equal(Look.split(lvalues, pad, size), lzc)
+
+
+@pytest.mark.parametrize('dtype', [np.uint32, np.int64])
+@pytest.mark.parametrize('size', [0, 1, 100, 512, 3000])
+def test_huffman_encoder_roundtrip(dtype, size):
+    data = _residuals(dtype, size)
+    data[::4] = 0
+    coded = HuffmanEncoder.encode(ResidualArray(data), 0, data.shape)
+    assert np.array_equal(HuffmanEncoder.decode(coded).array.view(dtype), data)
+
+
+def test_huffman_code_lengths_are_limited():
+    counts = 2**np.arange(40, dtype=np.int64)
+    lengths = _code_lengths(counts)
+    assert 12 < len(counts) and lengths.max() <= 12
+    assert np.sum(2.**-lengths.astype(float)) <= 1
+    data = np.repeat(np.uint32(1) << np.arange(32, dtype=np.uint32),
+                     (1.4**np.arange(32)).astype(int))
+    assert _code_lengths(np.bincount(32 - np.log2(data).astype(int) - 1)).max() == 12
+    coded = HuffmanEncoder.encode(ResidualArray(data), 0, data.shape)
+    assert np.array_equal(HuffmanEncoder.decode(coded).array, data)
+
+
+@pytest.mark.parametrize('chunk', [1, 3, 64])
+def test_huffman_decodes_across_chunks(chunk, monkeypatch):
+    monkeypatch.setattr('cframe.modifier.encoder.huffman._CHUNK', chunk)
+    data = _residuals(np.uint32, 2000)
+    data[::3] = 0
+    coded = HuffmanEncoder.encode(ResidualArray(data), 0, data.shape)
+    assert np.array_equal(HuffmanEncoder.decode(coded).array.view(np.uint32), data)
@@ -49,3 +49,13 @@ def test_floatarray_with_other_object(value):
     with pytest.raises(TypeError) as err:
         _ = FloatArray(ARR) == value
     assert "Comparison failed" in str(err)
+
+
+@pytest.mark.parametrize("dtype, expected", [
+    (np.float32, np.float32),
+    (None, np.float64),
+])
+def test_from_numpy_precision(dtype, expected):
+    """Downcast to float32 only on request."""
+    farr = FloatArray.from_numpy(ARR.astype(np.float64), dtype=dtype)
+    assert farr.array.dtype == expected
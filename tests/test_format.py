@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+# coding: utf-8
+"""
+Tests for the pasc format.
+"""
+
+from cframe.objects.arrays.residualarray import ResidualArray
+from cframe.modifier.encoder.raw import RawEncoder
+from cframe.modifier.encoder.f1 import F1
+from cframe.modifier.encoder.huffman import HuffmanEncoder
+from cframe.format.pascformat import Format
+from cframe.format.pscfile import PSCFile
+from cframe.objects.arrays.floatarray import FloatArray
+from cframe.toolbox.workflow import Workflow
+from cframe.modifier.mapper.ordered import Ordered
+from cframe.modifier.sequencer.linear import Linear
+from cframe.modifier.predictor.lastvalue import LastValue
+from cframe.modifier.subtractor.xor import XOR
+import numpy as np
+import pytest
+
+ENC = [
+    RawEncoder,
+    F1,
+    HuffmanEncoder,
+]
+
+
+def _residuals(dtype, shape):
+    data = np.random.laplace(0, 2**10, shape).astype(np.int64).astype(dtype)
+    data.flat[::7] = 0
+    return data
+
+
+@pytest.mark.parametrize('encoder', ENC)
+@pytest.mark.parametrize('dtype', [np.uint32, np.int64])
+@pytest.mark.parametrize('start', [0, 5])
+def test_encoders_roundtrip_through_format(encoder, dtype, start):
+    data = [_residuals(dtype, (13, 7)) for _ in range(3)]
+    coded = [encoder.encode(ResidualArray(x), start, x.shape) for x in data]
+    result = Format.from_bytes(Format.to_bytes(coded))
+    for before, after, x in zip(coded, result, data):
+        assert (after.lpad, after.npad, after.start) == (before.lpad, before.npad, start)
+        assert np.array_equal(encoder.decode(after).array.view(dtype), x)
+
+
+def test_write_and_mmap_read_are_zero_copy(tmp_path):
+    data = [_residuals(np.uint32, (40, 30)) for _ in range(4)]
+    coded = [RawEncoder.encode(ResidualArray(x), 3, x.shape) for x in data]
+    path = tmp_path / 'data.psc'
+    with open(path, 'wb') as f:
+        written = Format.write(coded, f)
+    assert written == path.stat().st_size
+    assert path.read_bytes() == Format.to_bytes(coded)
+    result = Format.read(path)
+    for before, after, x in zip(coded, result, data):
+        assert isinstance(after.bnoise, memoryview)
+        assert after == before and after.nbytes == before.nbytes
+        assert np.array_equal(RawEncoder.decode(after).array, x)
+
+
+def test_psc1_files_stay_readable(tmp_path):
+    data = [_residuals(np.uint32, (6, 5)) for _ in range(3)]
+    coded = [RawEncoder.encode(ResidualArray(x), 0, x.shape) for x in data]
+    byte = Format.to_bytes(coded, version=1)
+    assert byte[:4] == b'PSC1'
+    for after, x in zip(Format.from_bytes(byte), data):
+        assert np.array_equal(RawEncoder.decode(after).array, x)
+
+
+def test_psc2_index_allows_many_variables_and_shapes():
+    data = [_residuals(np.uint32, (k % 4 + 1, 3)) for k in range(300)]
+    coded = [RawEncoder.encode(ResidualArray(x), 0, x.shape) for x in data]
+    with pytest.raises(ValueError):
+        Format.to_bytes([coded[0]] * 300, version=1)
+    byte = Format.to_bytes(coded, shape=(750, 3))
+    header, index = Format.read_index(byte)
+    assert (header.nvars, header.shape, len(index)) == (300, (750, 3), 300)
+    after = Format.read_coded(byte, header, index[257])
+    assert after.shape == data[257].shape
+    assert np.array_equal(RawEncoder.decode(after).array, data[257])
+
+
+@pytest.mark.parametrize('version', [1, 2])
+def test_pscfile_decodes_and_caches_single_variables(tmp_path, version):
+    wf = Workflow(Ordered, Linear, LastValue, XOR, RawEncoder)
+    data = [FloatArray(np.random.randn(8, 9).astype(np.float32)) for _ in range(3)]
+    path = tmp_path / 'data.psc'
+    with open(path, 'wb') as f:
+        Format.write([wf.compress(x, 0) for x in data], f, version=version)
+    with PSCFile(path, wf, maxbytes=2 * data[0].array.nbytes) as psc:
+        assert len(psc) == 3 and psc.shape == (8, 9)
+        assert psc[2] == data[2] and psc[-1] is psc[2]
+        assert psc[0] == data[0] and psc[1] == data[1]
+        assert psc.nbytes == 2 * data[0].array.nbytes and 2 not in psc._cache
+
+
+@pytest.mark.parametrize('version', [1, 2])
+def test_pscfile_close_releases_the_map(tmp_path, version):
+    path = tmp_path / 'data.psc'
+    with open(path, 'wb') as f:
+        Format.write([RawEncoder.encode(ResidualArray(_residuals(np.uint32, (4, 5))), 0, (4, 5))],
+                     f, version=version)
+    psc = PSCFile(path)
+    index = psc.index
+    psc.close()
+    assert psc._mmap.closed and index['shape'][0].tolist() == [4, 5]
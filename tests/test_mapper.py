@@ -6,18 +6,161 @@ Tests for mapper functions.
 
 from cframe.objects.arrays.floatarray import FloatArray
 from cframe.modifier.mapper.lindstrom import Lindstrom
-from cframe.modifier.mapper.rawbinary import RawBinary
+from cframe.modifier.mapper.rawbinary import RawBinary, _reinterpret
+from cframe.modifier.mapper.ordered import Ordered
+from cframe.modifier.mapper.raw import Raw
+from bitstring import BitArray as ba
+import struct
 import numpy as np
 import pytest
 
 MAPPERS = [
     Lindstrom,
-    RawBinary
+    RawBinary,
+    Ordered,
+    Raw,
 ]
 
+FLOATS = [
+    (np.float32, 32),
+    (np.float64, 64),
+]
+
+SPECIAL = [0., 1., -1., np.inf, -np.inf, np.nan, 1e-40, -1e-40]
+
+
+def _floats(dtype):
+    values = np.random.randn(500) * 10.**np.random.randint(-30, 30, 500)
+    return np.concatenate([values, SPECIAL]).astype(dtype)
+
+
 @pytest.mark.parametrize('mapper', MAPPERS)
 def test_mapping_and_reverse_work(mapper):
     f = FloatArray.from_data('pre', 'tas')
     iarr = mapper.map(f)
     fnew = mapper.revmap(iarr)
-    assert np.array_equal(fnew.array, f.array)
\ No newline at end of file
+    assert np.array_equal(fnew.array, f.array)
+
+
+def _lindstrom(value, length):
+    """Reference Lindstrom mapping of a single float with bitstring."""
+    result = ba(floatbe=value, length=length)
+    if value < 0:
+        result.invert()
+    else:
+        result.invert(0)
+    return result.uintbe
+
+
+def _raw(value, itype, otype):
+    """Reference RawBinary mapping of a single float with struct."""
+    return struct.unpack(otype, struct.pack(itype, value))[0]
+
+
+@pytest.mark.parametrize('dtype, bits', FLOATS)
+def test_lindstrom_equals_bitstring_mapping(dtype, bits):
+    data = _floats(dtype)
+    expected = np.array([_lindstrom(x, bits) for x in data.ravel()],
+                        'uint{}'.format(bits)).reshape(data.shape)
+    assert np.array_equal(Lindstrom.map(FloatArray(data)).array, expected)
+
+
+@pytest.mark.parametrize('dtype, bits', FLOATS)
+def test_lindstrom_saves_order(dtype, bits):
+    data = np.sort(_floats(dtype)[:-3])
+    mapped = Lindstrom.map(FloatArray(data)).array
+    assert mapped.dtype == np.dtype('uint{}'.format(bits))
+    assert np.all(np.diff(mapped.astype(float)) >= 0)
+
+
+@pytest.mark.parametrize('dtype, bits', FLOATS)
+def test_lindstrom_bitwise_roundtrip(dtype, bits):
+    data = np.append(_floats(dtype), -np.zeros(1, dtype))
+    fnew = Lindstrom.revmap(Lindstrom.map(FloatArray(data)))
+    assert fnew.array.dtype == data.dtype
+    assert np.array_equal(fnew.array.view('uint{}'.format(bits)),
+                          data.view('uint{}'.format(bits)))
+
+
+@pytest.mark.parametrize('mapper', MAPPERS)
+@pytest.mark.parametrize('dtype, bits', FLOATS)
+def test_bitwise_roundtrip_all_mappers(mapper, dtype, bits):
+    data = np.append(_floats(dtype), -np.zeros(1, dtype))
+    fnew = mapper.revmap(mapper.map(FloatArray(data)))
+    assert fnew.array.dtype == data.dtype
+    assert np.array_equal(fnew.array.view('uint{}'.format(bits)),
+                          data.view('uint{}'.format(bits)))
+
+
+@pytest.mark.parametrize('mapper, idtype', [(Ordered, 'uint'), (Raw, 'int')])
+@pytest.mark.parametrize('dtype, bits', FLOATS)
+def test_out_buffers_are_reused(mapper, idtype, dtype, bits):
+    data = FloatArray(_floats(dtype).reshape(4, -1))
+    iout = np.empty(data.array.shape, '{}{}'.format(idtype, bits))
+    fout = np.empty(data.array.shape, dtype)
+    for _ in range(2):
+        iarr = mapper.map(data, out=iout)
+        farr = mapper.revmap(iarr, out=fout)
+        assert iarr.array is iout and farr.array is fout
+        assert farr == data
+
+
+def test_ordered_keeps_ordered_mapping():
+    data = np.array([-np.inf, -2., -1e-40, 0., 1e-40, 3., np.inf], np.float32)
+    mapped = Ordered.map(FloatArray(data)).array
+    assert np.all(np.diff(mapped.astype(float)) > 0)
+    positive = data > 0
+    assert np.array_equal(mapped[positive], data[positive].view(np.uint32) + 2**31)
+    assert np.array_equal(mapped[~positive][:-1], ~data[data < 0].view(np.uint32))
+
+
+def test_lindstrom_out_buffers_are_reused():
+    data = FloatArray(_floats(np.float32).reshape(2, -1))
+    iout = np.empty(data.array.shape, np.uint32)
+    fout = np.empty(data.array.shape, np.float32)
+    iarr = Lindstrom.map(data, out=iout)
+    farr = Lindstrom.revmap(iarr, out=fout)
+    assert iarr.array is iout and farr.array is fout
+    assert farr == data
+
+
+@pytest.mark.parametrize('dtype, fmt', [
+    (np.float32, ('>f', '>l')),
+    (np.float64, ('>d', '>Q')),
+])
+def test_rawbinary_equals_struct_mapping(dtype, fmt):
+    data, bits = _floats(dtype), 8 * np.dtype(dtype).itemsize
+    expected = np.array([_raw(x, *fmt) % 2**bits for x in data],
+                        dtype='uint{}'.format(bits))
+    result = RawBinary.map(FloatArray(data)).array
+    assert np.array_equal(result.view(expected.dtype), expected)
+
+
+@pytest.mark.parametrize('dtype', [np.float32, np.float64])
+def test_rawbinary_inplace_is_zero_copy(dtype):
+    data = _floats(dtype)
+    expected = data.copy()
+    iarr = RawBinary.map(FloatArray(data), inplace=True)
+    assert np.shares_memory(iarr.array, data)
+    farr = RawBinary.revmap(iarr, inplace=True)
+    assert np.shares_memory(farr.array, data)
+    assert np.array_equal(farr.array.view(iarr.dtype), expected.view(iarr.dtype))
+
+
+@pytest.mark.parametrize('inplace', [True, False])
+def test_rawbinary_swaps_nonnative_bytes(inplace):
+    data = _floats(np.float32)
+    swapped = data.astype(data.dtype.newbyteorder('S'))
+    result = _reinterpret(swapped, np.int32, inplace=inplace)
+    assert result.dtype.isnative
+    assert np.array_equal(result, data.view(np.int32))
+
+
+@pytest.mark.parametrize('out, error', [
+    (np.empty(3, np.uint32), ValueError),
+    (np.empty(508, np.uint64), TypeError),
+    ([0] * 508, TypeError),
+])
+def test_lindstrom_out_buffer_errors(out, error):
+    with pytest.raises(error):
+        Lindstrom.map(FloatArray(_floats(np.float32)), out=out)
@@ -0,0 +1,227 @@
+#!/usr/bin/env python
+# coding: utf-8
+"""
+Tests for predictor modifiers.
+"""
+
+from cframe.modifier.predictor.lastvalue import LastValue
+from cframe.modifier.predictor.stride import Stride
+from cframe.modifier.predictor.twostride import TwoStride
+from cframe.modifier.predictor.akumuli import Akumuli
+from cframe.modifier.predictor.ensemble import MostRight, LastBest
+from cframe.modifier.predictor.__context import Select, Fold, ContextHash
+from cframe.modifier.predictor.lorenzo import Lorenzo
+from cframe.modifier.predictor.strideconfidence import StrideConfidence7
+from cframe.objects.arrays.integerarray import IntegerArray
+from cframe.objects.arrays.predictionarray import PredictionArray
+from cframe.modifier.sequencer.linear import Linear
+from cframe.modifier.subtractor.xor import XOR
+from cframe.modifier.subtractor.floatingpoint import FPD
+from cframe.toolbox.feeder import SeqFeeder, MultiFeeder
+from cframe.toolbox.workflow import recon_iarr, reverse
+from functools import reduce
+from operator import xor
+import numpy as np
+import pytest
+
+BATCH = [
+    LastValue,
+    Stride,
+    TwoStride,
+]
+
+DTYPES = [np.uint32, np.int32, np.uint64, np.int64]
+
+
+def _sequence(dtype, size=400):
+    info = np.iinfo(dtype)
+    data = np.random.randint(info.min, info.max, size, dtype=dtype)
+    data[size // 8:size // 4] = data[size // 8]
+    data[size // 2:size // 2 + 30] = np.arange(30, dtype=dtype)[:size // 2] * 7
+    return data
+
+
+def _scalar(predictor, data):
+    p = predictor()
+    result = np.zeros_like(data)
+    for i, value in enumerate(data):
+        result[i] = p.predict()
+        p.update(value)
+    return result, p
+
+
+@pytest.mark.parametrize('predictor', BATCH)
+@pytest.mark.parametrize('dtype', DTYPES)
+@pytest.mark.filterwarnings('ignore::RuntimeWarning')
+def test_predict_all_equals_scalar_protocol(predictor, dtype):
+    data = _sequence(dtype)
+    expected, scalar = _scalar(predictor, data)
+    p = predictor()
+    result = np.concatenate([p.predict_all(data[:1]), p.predict_all(data[1:200]),
+                             p.predict_all(data[200:])])
+    assert np.array_equal(result, expected)
+    assert p.predict() == scalar.predict()
+
+
+@pytest.mark.parametrize('predictor', BATCH)
+@pytest.mark.filterwarnings('ignore::RuntimeWarning')
+def test_feeder_uses_predict_all(predictor, monkeypatch):
+    data = _sequence(np.uint32, 60).reshape(6, 10)
+    seq = Linear.flatten(7, IntegerArray(data))
+    _, expected = SeqFeeder(predictor).feed(seq)
+    monkeypatch.setattr(predictor, 'predict_all', None)
+    _, scalar = SeqFeeder(predictor).feed(seq)
+    assert np.array_equal(expected.array, scalar.array)
+
+
+@pytest.mark.parametrize('predictor, subtractor', [
+    (LastValue, XOR),
+    (LastValue, FPD),
+    (Stride, FPD),
+])
+@pytest.mark.parametrize('dtype', DTYPES)
+@pytest.mark.filterwarnings('ignore::RuntimeWarning')
+def test_reconstruct_all_inverts_prediction(predictor, subtractor, dtype):
+    data = _sequence(dtype)
+    residuals = subtractor.subtract(PredictionArray(predictor().predict_all(data)),
+                                    IntegerArray(data)).array
+    result = recon_iarr(residuals, predictor, 0, subtractor)
+    generic = np.array(list(reverse(residuals, predictor, subtractor)))
+    assert result.dtype == data.dtype
+    assert np.array_equal(result, data)
+    assert np.array_equal(generic.astype(dtype), data)
+
+
+def test_reconstruct_all_rejects_unknown_subtractor():
+    assert Stride().reconstruct_all(np.zeros(3, np.uint32), XOR) is NotImplemented
+
+
+@pytest.mark.parametrize('dtype, bits', [(np.uint32, 32), (np.int32, 32), (np.int64, 64)])
+@pytest.mark.parametrize('table_size', [1, 16, 128, 4096])
+def test_akumuli_kernels_equal_scalar_protocol(dtype, bits, table_size):
+    data = _sequence(dtype, 2000)
+    data[1000:] = data[:1000]
+    scalar = Akumuli(bits=bits, table_size=table_size)
+    expected = np.zeros_like(data)
+    for i, value in enumerate(data):
+        expected[i] = scalar.predict()
+        scalar.update(value)
+    p = Akumuli(bits=bits, table_size=table_size)
+    result = np.concatenate([p.predict_all(data[:3]), p.predict_all(data[3:])])
+    assert np.array_equal(result, expected)
+    assert p._table == scalar._table and p._last_hash == scalar._last_hash
+    for subtractor in (XOR, FPD):
+        residuals = subtractor.ufunc(expected, data)
+        r = Akumuli(bits=bits, table_size=table_size)
+        assert np.array_equal(r.reconstruct_all(residuals, subtractor), data)
+        assert r._table == scalar._table
+
+
+@pytest.mark.parametrize('ensemble', [MostRight, LastBest])
+@pytest.mark.parametrize('dtype', [np.uint32, np.int32, np.int64])
+@pytest.mark.filterwarnings('ignore::RuntimeWarning')
+def test_ensemble_predict_all_equals_scalar_protocol(ensemble, dtype, monkeypatch):
+    monkeypatch.setattr('cframe.modifier.predictor.ensemble._CHUNK', 64)
+    data = np.random.randint(-2**20, 2**20, 1000).cumsum().astype(dtype)
+    data[300:400] = data[300]
+    members = [LastValue, Stride, TwoStride, Akumuli]
+    scalar = ensemble(members, bits=8 * data.itemsize)
+    expected = np.zeros_like(data)
+    for i, value in enumerate(data):
+        expected[i] = scalar.predict()
+        scalar.update(value)
+    p = ensemble(members, bits=8 * data.itemsize)
+    result = np.concatenate([p.predict_all(data[:500]), p.predict_all(data[500:])])
+    assert np.array_equal(result, expected)
+    assert p.lastbest == scalar.lastbest and p.counter == scalar.counter
+
+
+
+@pytest.mark.parametrize('ensemble', [MostRight, LastBest])
+@pytest.mark.parametrize('dtype', [np.int32, np.int64])
+@pytest.mark.filterwarnings('ignore::RuntimeWarning')
+def test_ensemble_roundtrip_full_range_signed(ensemble, dtype):
+    info = np.iinfo(dtype)
+    data = np.random.randint(info.min, info.max, 2000, dtype=dtype)
+    data[500:600:2], data[501:600:2] = info.min, info.max
+    members, bits = [LastValue, Stride], 8 * data.itemsize
+    residuals = XOR.ufunc(ensemble(members, bits=bits).predict_all(data), data)
+    result = list(reverse(residuals, ensemble, XOR, members, bits=bits))
+    assert np.array_equal(np.array(result, dtype), data)
+
+def _bin_fold(num, mode):
+    """Reference Fold on binary strings."""
+    binary, length = bin(num)[2:], int(mode[1:])
+    if mode[0] == '<':
+        chunks = [binary[i:i + length] for i in range(0, len(binary), length)]
+    else:
+        chunks = [binary[max(i - length, 0):i] for i in range(len(binary), 0, -length)]
+    return reduce(xor, [int(x, 2) for x in chunks])
+
+
+@pytest.mark.parametrize('mode', ['<3', '<5', '>5', '>7', '<32', '>1'])
+@pytest.mark.parametrize('bits', [32, 64])
+def test_context_blocks_equal_binary_strings(mode, bits):
+    for num in [0, 1, 2**bits - 1] + np.random.randint(0, 2**31, 50).tolist():
+        assert Fold(mode, bits)(num) == _bin_fold(num, mode)
+        if mode[0] == '<':
+            assert Select(mode, bits)(num) == int(bin(num)[2:int(mode[1:])], 2)
+        else:
+            assert Select(mode, bits)(num) == num & (2**int(mode[1:]) - 1)
+
+
+@pytest.mark.parametrize('L', [None, '>10', '<12'])
+def test_context_hash_all_equals_single_histories(L):
+    h = ContextHash(['>20', '<30'], ['>5', '<7'], ['<3', '>1'], L, bits=32)
+    histories = np.random.randint(0, 2**32, (500, 2)).astype(np.uint32)
+    histories[::7, 1] = 0
+    result = h.hash_all(histories)
+    expected = [h(x) for x in histories.tolist()]
+    assert [x is None for x in expected] == result.mask.tolist()
+    assert [x for x in expected if x is not None] == result.compressed().tolist()
+
+
+@pytest.mark.parametrize('shape', [(9,), (7, 5), (4, 6, 5)])
+@pytest.mark.parametrize('subtractor', [XOR, FPD])
+@pytest.mark.parametrize('dtype', [np.uint32, np.int64])
+def test_lorenzo_roundtrip(shape, subtractor, dtype):
+    grid = IntegerArray(np.random.randint(-2**30, 2**30, shape).astype(dtype))
+    p = Lorenzo()
+    residuals = subtractor.subtract(p.predict(grid), grid)
+    assert p.reconstruct(residuals, subtractor) == grid
+
+
+def test_lorenzo_predicts_planes_exactly():
+    y, x = np.mgrid[0:6, 0:8]
+    grid = IntegerArray((3 * x + 5 * y + 7).astype(np.int32))
+    prediction = Lorenzo().predict(grid).array
+    assert np.array_equal(prediction[1:, 1:], grid.array[1:, 1:])
+    assert np.array_equal(prediction[0, 1:], grid.array[0, :-1])
+
+
+@pytest.mark.parametrize('predictor', [Stride, StrideConfidence7])
+def test_feeder_reuses_output_buffers(predictor):
+    data = _sequence(np.uint32, 60).reshape(6, 10)
+    seq = Linear.flatten(7, IntegerArray(data))
+    feeder = SeqFeeder(predictor)
+    out, seqbuf = np.empty((6, 10), np.uint32), np.empty(60, np.uint32)
+    _, expected = feeder.feed(seq)
+    _, parr = feeder.feed(seq, out=out, seqbuf=seqbuf)
+    assert parr.array is out and np.array_equal(out, expected.array)
+    _, preds = feeder.feed(seq, pa=False, out=seqbuf)
+    assert preds is seqbuf and np.array_equal(out.flat[seq.sequence], seqbuf)
+    assert 'bits' not in feeder.kwargs
+
+
+def test_multifeeder_equals_single_feeders():
+    predictors = [LastValue, Akumuli, TwoStride, StrideConfidence7]
+    data = _sequence(np.uint32, 300).reshape(15, 20)
+    seq = Linear.flatten(11, IntegerArray(data))
+    feeder = MultiFeeder(predictors)
+    for (name, parr), predictor in zip(feeder.feed(seq), predictors):
+        expected_name, expected = SeqFeeder(predictor).feed(seq)
+        assert name == expected_name
+        assert np.array_equal(parr.array, expected.array)
+    report = dict(feeder.report(seq, [XOR, FPD]))
+    assert set(report['Last Value']) == {XOR.name, FPD.name}
+    assert report['Last Value'][XOR.name]['Filesize [bits]'] == 300 * 32
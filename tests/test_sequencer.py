@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+# coding: utf-8
+"""
+Tests for sequencer modifiers.
+"""
+
+from cframe.objects.arrays.integerarray import IntegerArray
+from cframe.objects.sequence import IndexSequence
+from cframe.modifier.sequencer import _index_dtype
+from cframe.modifier.sequencer.linear import Linear
+from cframe.modifier.sequencer.morton import Morton
+from cframe.modifier.sequencer.hilbert import Hilbert
+import numpy as np
+import pytest
+
+SHAPES = [
+    (7,),
+    (5, 3),
+    (4, 3, 5),
+]
+
+ORDERS = [None, 'C', 'f', 'reversed']
+
+
+def _nodename_flatten(startnode, arr, order=None):
+    """Reference traversal via string node names."""
+    nodenames = (np.arange(arr.size).reshape(arr.shape) + 1).astype(str)
+    if not order or order in ('c', 'C'):
+        new = nodenames.copy()
+    elif order in ('f', 'F'):
+        new = np.transpose(nodenames).copy()
+    else:
+        new = np.transpose(nodenames, order).copy()
+    startidx = np.where(new.flat == str(startnode + 1))[0][0]
+    return np.roll(new.flat, -startidx).astype(np.int32) - 1
+
+
+@pytest.mark.parametrize('shape', SHAPES)
+@pytest.mark.parametrize('order', ORDERS)
+@pytest.mark.parametrize('start', [0, 2, -1])
+def test_linear_equals_nodename_traversal(shape, order, start):
+    arr = np.random.randint(0, 2**31, shape).astype(np.uint32)
+    start = start % arr.size
+    if order == 'reversed':
+        order = tuple(reversed(range(arr.ndim)))
+    seqobj = Linear.flatten(start, IntegerArray(arr), order)
+    seq = _nodename_flatten(start, arr, order)
+    assert isinstance(seqobj, IndexSequence)
+    assert np.array_equal(seqobj.sequence, seq)
+    assert np.array_equal(seqobj.data, arr.flat[seq])
+    assert seqobj.data.dtype == arr.dtype
+
+
+def test_linear_accepts_node_names():
+    arr = IntegerArray(np.arange(12, dtype=np.int32).reshape(3, 4))
+    assert np.array_equal(Linear.flatten('6', arr).sequence,
+                          Linear.flatten(5, arr).sequence)
+
+
+@pytest.mark.parametrize('start, error', [(12, ValueError), (-1, ValueError),
+                                          (1.5, TypeError)])
+def test_linear_invalid_startnode(start, error):
+    arr = IntegerArray(np.arange(12, dtype=np.int32).reshape(3, 4))
+    with pytest.raises(error):
+        Linear.flatten(start, arr)
+
+
+def test_index_dtype_for_large_arrays():
+    assert _index_dtype(2**31 - 1) == np.int32
+    assert _index_dtype(2**31) == np.int64
+
+
+CURVES = [Morton, Hilbert]
+
+
+def _morton_key(coords, bits):
+    """Reference Morton key via per bit interleaving."""
+    key = 0
+    for bit in range(bits):
+        for rank, c in enumerate(coords):
+            key |= ((int(c) >> bit) & 1) << (bit * len(coords) + len(coords) - 1 - rank)
+    return key
+
+
+@pytest.mark.parametrize('sequencer', CURVES)
+@pytest.mark.parametrize('shape', [(5, 3), (4, 3, 5), (8, 8), (1, 6)])
+@pytest.mark.parametrize('start', [0, 4])
+def test_curves_are_permutations(sequencer, shape, start):
+    arr = np.random.randint(0, 2**31, shape).astype(np.uint32)
+    seqobj = sequencer.flatten(start, IntegerArray(arr))
+    assert seqobj.sequence[0] == start
+    assert np.array_equal(np.sort(seqobj.sequence), np.arange(arr.size))
+    assert np.array_equal(seqobj.data, arr.flat[seqobj.sequence])
+
+
+@pytest.mark.parametrize('shape, order', [((6, 5), None), ((3, 4, 5), 'F')])
+def test_morton_equals_bit_interleaving(shape, order):
+    seq = Morton.indices(0, shape, order)
+    axes = list(range(len(shape)))[::1 if order is None else -1]
+    coords = np.unravel_index(np.arange(np.prod(shape)), shape)
+    keys = [_morton_key([coords[a][i] for a in axes], 3)
+            for i in range(np.prod(shape))]
+    assert np.array_equal(seq, np.argsort(keys, kind='stable'))
+
+
+@pytest.mark.parametrize('shape', [(16, 16), (8, 8, 8)])
+def test_hilbert_steps_to_neighbours(shape):
+    coords = np.array(np.unravel_index(Hilbert.indices(0, shape), shape))
+    assert np.all(np.abs(np.diff(coords, axis=1)).sum(axis=0) == 1)
+
+
+@pytest.mark.parametrize('sequencer', CURVES)
+def test_curves_reject_one_dimension(sequencer):
+    with pytest.raises(ValueError):
+        sequencer.flatten(0, IntegerArray(np.arange(8, dtype=np.int32)))
@@ -4,9 +4,26 @@
 Tests for toolbox.
 """
 
+from unittest import mock
+import tempfile
 import pytest
 import numpy as np
 from cframe import toolbox
+from cframe.format.pscfile import PSCFile
+from cframe.modifier.encoder.raw import RawEncoder
+from cframe.modifier.mapper.ordered import Ordered
+from cframe.modifier.mapper.raw import Raw
+from cframe.modifier.predictor.lastvalue import LastValue
+from cframe.modifier.sequencer.linear import Linear
+from cframe.modifier.subtractor.floatingpoint import FPD
+from cframe.modifier.subtractor.xor import XOR
+from cframe.objects.arrays.floatarray import FloatArray
+from cframe.toolbox import bitops, tiling
+from cframe.toolbox.parallel import ParallelProcessWorkflow, _spill
+from cframe.toolbox.plancache import PlanCache
+from cframe.toolbox.tiling import TiledWorkflow, _blocks
+from cframe.toolbox.workerpool import WorkerPool
+from cframe.toolbox.workflow import Workflow
 
 FAIL_DTYPES = [np.uint8, np.uint16, np.int8]
 
@@ -27,4 +44,152 @@ CORRECT_BITS = [
 def test_get_bits_pass(dtype, expected):
     data = np.arange(0, 3, 1, dtype)
     result = toolbox.get_bits(data)
-    assert result == expected
\ No newline at end of file
+    assert result == expected
+
+
+def test_plancache_shares_readonly_plans():
+    cache = PlanCache()
+    seq = cache.indices(Linear, 3, (4, 5))
+    assert cache.indices(Linear, 3, (4, 5)) is seq
+    assert not seq.flags.writeable
+    assert (cache.hits, cache.misses) == (1, 1)
+    inv = cache.inverse(Linear, 3, (4, 5))
+    assert np.array_equal(seq[inv], np.arange(20))
+
+
+def test_plancache_evicts_least_recently_used():
+    cache = PlanCache(maxbytes=2 * 100 * 4)
+    first = cache.indices(Linear, 0, (10, 10))
+    cache.indices(Linear, 1, (10, 10))
+    cache.indices(Linear, 0, (10, 10))
+    cache.indices(Linear, 2, (10, 10))
+    assert len(cache) == 2 and cache.nbytes == 800
+    assert cache.indices(Linear, 0, (10, 10)) is first
+    assert cache.indices(Linear, 1, (10, 10)) is not None and cache.misses == 4
+
+
+@pytest.mark.parametrize('dtype', [np.uint32, np.int32, np.uint64, np.int64])
+def test_bitops_equal_python_ints(dtype):
+    bits = 8 * np.dtype(dtype).itemsize
+    data = np.random.randint(0, 2**62, 1000).astype(np.uint64) >> \
+        np.random.randint(0, 63, 1000).astype(np.uint64)
+    data = np.concatenate([data, [0, 1, 2**64 - 1, 2**53 + 1]]).astype(np.uint64).astype(dtype)
+    ints = [int(x) % 2**bits for x in data]
+    assert bitops.bit_length(data).tolist() == [x.bit_length() for x in ints]
+    assert bitops.lzc(data).tolist() == [bits - x.bit_length() for x in ints]
+    assert bitops.tzc(data).tolist() == [(x & -x).bit_length() - 1 if x else bits for x in ints]
+    assert bitops.popcount(data).tolist() == [bin(x).count('1') for x in ints]
+
+
+def test_tiled_blocks_cover_array_once():
+    count = np.zeros((5, 7, 3), int)
+    blocks = _blocks(count.shape, (2, 3))
+    for block in blocks:
+        count[block] += 1
+    assert len(blocks) == 9 and np.all(count == 1)
+
+
+@pytest.mark.parametrize('cpus', [1, 2])
+def test_tiled_workflow_roundtrip_through_psc2(tmp_path, cpus):
+    data = FloatArray(np.random.randn(6, 10, 9).astype(np.float32))
+    tiled = TiledWorkflow(Workflow(Ordered, Linear, LastValue, XOR, RawEncoder), (4, 4), cpus)
+    coded = tiled.compress(data, 1)
+    assert len(coded) == 2 * 3 and coded[-1].shape == (2, 2, 9)
+    assert tiled.decompress(coded, data.array.shape) == data
+    path = tmp_path / 'tiled.psc'
+    with open(path, 'wb') as f:
+        tiled.write(data, f, 1)
+    assert TiledWorkflow(tiled.workflow, (1,), cpus).read(path) == data
+
+
+
+def test_tiled_workflow_clamps_start_to_edge_blocks():
+    data = FloatArray(np.random.randn(10, 7).astype(np.float32))
+    tiled = TiledWorkflow(Workflow(Ordered, Linear, LastValue, XOR, RawEncoder), (4, 4), 1)
+    coded = tiled.compress(data, 11)
+    assert [x.start for x in coded] == [11, 11, 11, 11, 7, 5]
+    assert tiled.decompress(coded, data.array.shape) == data
+
+@pytest.mark.parametrize('region', [
+    (slice(None),),
+    (slice(1, 5), slice(3, 9), 4),
+    (2, slice(None, None, -3)),
+    (-1, slice(5, 5)),
+    (slice(4, 0, -2), 9, slice(-2, None)),
+])
+def test_tiled_region_decodes_intersecting_blocks(tmp_path, region):
+    data = np.random.randn(6, 10, 9).astype(np.float32)
+    wf = Workflow(Ordered, Linear, LastValue, XOR, RawEncoder)
+    path = tmp_path / 'tiled.psc'
+    with open(path, 'wb') as f:
+        tiling.TiledWorkflow(wf, (4, 4, 5), 1).write(data, f)
+    with PSCFile(path, wf) as psc, \
+            mock.patch.object(tiling, '_decompress_block', wraps=tiling._decompress_block) as dec:
+        result = psc.decompress_region(region, cpus=1)
+        assert np.array_equal(result.array, data[region])
+        assert dec.call_count <= 2 * 3 * 2
+        if region == (slice(1, 5), slice(3, 9), 4):
+            assert dec.call_count == 2 * 3 * 1
+
+
+def test_parallel_compress_shares_input_and_spills_results(tmp_path):
+    data = FloatArray(np.random.randn(20, 30).astype(np.float32))
+    workflows = [Workflow(m, Linear, LastValue, sb, RawEncoder)
+                 for m in [Ordered, Raw] for sb in [XOR, FPD]]
+    results = dict(ParallelProcessWorkflow().compress(workflows, data, 0, None, 2, tmp_path))
+    assert len(results) == 4 and list(tmp_path.iterdir()) == []
+    for wf in workflows:
+        assert isinstance(results[str(wf)].bnoise, memoryview)
+        assert wf.decompress(results[str(wf)]) == data
+
+
+def test_parallel_decompress_maps_results_to_workflows():
+    data = [FloatArray(np.random.randn(3, 20, 30).astype(dtype))
+            for dtype in (np.float32, np.float64)]
+    workflows = [Workflow(m, Linear, LastValue, XOR, RawEncoder) for m in [Ordered, Raw]]
+    par = ParallelProcessWorkflow()
+    results = dict(par.compress(workflows, data[0], 0, None, 2))
+    keyed = [(str(workflows[0]), results[str(workflows[0])]), (1, results[str(workflows[1])]),
+             (workflows[0], workflows[0].compress(data[1], 0)), ('failed', 'Error')]
+    decoded = list(par.decompress(workflows, keyed, 2))
+    assert sorted(str(k) for k, _ in decoded) == sorted(str(k) for k, _ in keyed[:3])
+    for key, farr in decoded:
+        assert farr == (data[1] if key is workflows[0] else data[0])
+        assert farr.array.base.filename.startswith(_spill(None) or tempfile.gettempdir())
+
+
+def test_parallel_decompress_bounds_live_outputs(tmp_path):
+    wf = Workflow(Ordered, Linear, LastValue, XOR, RawEncoder)
+    data = [FloatArray(np.random.randn(6, 7).astype(np.float32)) for _ in range(5)]
+    consumed = []
+
+    def results():
+        for i, x in enumerate(data):
+            consumed.append(i)
+            yield i, wf.compress(x, 0)
+
+    decoded = ParallelProcessWorkflow().decompress([wf] * 5, results(), 2, tmp_path, 1)
+    key, farr = next(decoded)
+    assert len(consumed) <= 2 and farr == data[key]
+    assert isinstance(farr.array.base, np.memmap)
+    rest = dict(decoded)
+    assert sorted(rest) == sorted(set(range(5)) - {key})
+    assert all(rest[k] == data[k] for k in rest)
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_worker_pool_streams_jobs_with_bounded_depth(tmp_path):
+    wf = Workflow(Ordered, Linear, LastValue, XOR, RawEncoder)
+    data = [np.random.randn(10, 12).astype(np.float32) for _ in range(5)]
+    with WorkerPool(cpus=2, maxpending=2, spill=tmp_path) as pool:
+        jobs = [(wf, x) for x in data] + [(wf, np.zeros(3, np.int8))]
+        results = list(pool.imap(iter(jobs)))
+        again = pool.submit(wf, FloatArray(data[0])).result()
+    assert sorted(id(job) for job, _ in results) == sorted(id(job) for job in jobs)
+    for job, coded in results:
+        if job is jobs[-1]:
+            assert isinstance(coded, Exception)
+        else:
+            assert wf.decompress(coded) == FloatArray(job[1])
+    assert wf.decompress(again) == FloatArray(data[0])
+    assert list(tmp_path.iterdir()) == []
@@ -6,6 +6,7 @@ Tests for workflow process
 
 import pytest
 import os
+import numpy as np
 from cframe.toolbox.workflow import Workflow
 from cframe.toolbox import get_bits
 from cframe.objects.arrays.floatarray import FloatArray
@@ -24,6 +25,7 @@ from cframe.modifier.sequencer.linear import Linear
 # Predictor
 from cframe.modifier.predictor.lastvalue import LastValue
 from cframe.modifier.predictor.stride import Stride
+from cframe.modifier.predictor.strideconfidence import StrideConfidence7
 
 # Subtractor
 from cframe.modifier.subtractor.xor import XOR
@@ -78,4 +80,13 @@ def test_full_workflow_chain(data, mapp, seq, pre, sub, enc, start):
     wf = Workflow(mapp, seq, pre, sub, enc)
     coded = wf.compress(data, start, SeqFeeder)
     result = wf.decompress(coded)
-    assert result == data
\ No newline at end of file
+    assert result == data
+
+
+@pytest.mark.parametrize('mapp', [Ordered, Raw])
+@pytest.mark.parametrize('feeder', [None, SeqFeeder])
+def test_workflow_with_partial_predictor(mapp, feeder):
+    data = FloatArray(np.random.randn(12, 15).astype(np.float32))
+    wf = Workflow(mapp, Linear, StrideConfidence7, XOR, RawEncoder)
+    coded = wf.compress(data, 3, feeder)
+    assert wf.decompress(coded) == data